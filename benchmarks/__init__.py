@@ -0,0 +1,11 @@
+"""Load tests of the Yatube read and write paths.
+
+    python -m benchmarks seed --users 20000 --posts 2000000
+    python -m benchmarks run --concurrency 8 --requests 2000 \\
+        --out results.json --baseline baseline.json
+    python -m benchmarks pool --threads 4 --pool-size 4
+    python -m benchmarks render --cards 10 50
+
+Point the settings at a scratch database before seeding, e.g.
+SQLITE_PATH=/tmp/yatube-bench.sqlite3 (or DATABASE_URL for PostgreSQL).
+"""
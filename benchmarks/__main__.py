@@ -0,0 +1,59 @@
+import argparse
+import os
+
+import django
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    seed = commands.add_parser('seed', help='Fill the database.')
+    seed.add_argument('--users', type=int, default=20000)
+    seed.add_argument('--posts', type=int, default=1000000)
+    seed.add_argument('--groups', type=int, default=50)
+    seed.add_argument('--follows', type=int, default=30,
+                      help='Average number of authors a user follows.')
+    seed.add_argument('--comments', type=int, default=200000)
+
+    run = commands.add_parser('run', help='Measure the views.')
+    run.add_argument('--concurrency', type=int, default=8)
+    run.add_argument('--requests', type=int, default=1000,
+                     help='Requests per scenario.')
+    run.add_argument('--scenario', action='append',
+                     help='Only run these scenarios.')
+    run.add_argument('--out', help='Write the results to this JSON file.')
+    run.add_argument('--baseline', help='Compare with an earlier JSON file.')
+
+    pool = commands.add_parser(
+        'pool', help='Compare new connections with the connection pool.'
+    )
+    pool.add_argument('--requests', type=int, default=2000)
+    pool.add_argument('--threads', type=int, default=4)
+    pool.add_argument('--pool-size', type=int, default=4)
+
+    render = commands.add_parser(
+        'render', help='Time the rendering of feed cards.'
+    )
+    render.add_argument('--cards', type=int, nargs='+', default=[10, 50])
+    render.add_argument('--repeat', type=int, default=200)
+
+    args = parser.parse_args()
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    django.setup()
+    if args.command == 'seed':
+        from .seed import seed
+        seed(args.users, args.posts, args.groups, args.follows, args.comments)
+    elif args.command == 'render':
+        from .render import run_render
+        run_render(args)
+    elif args.command == 'pool':
+        from .pool import run_pool
+        run_pool(args)
+    else:
+        from .run import run
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
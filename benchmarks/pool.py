@@ -0,0 +1,66 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections
+from django.db.utils import load_backend
+
+from .run import percentile
+
+PLAIN_ENGINE = 'django.db.backends.postgresql'
+POOLED_ENGINE = 'yatube.db.postgresql'
+
+
+def measure(engine, requests, threads, pool_size):
+    """Latency of a request's database work when every request connects
+    (as with CONN_MAX_AGE = 0), or takes a connection from the pool."""
+    backend = load_backend(engine)
+    settings_dict = {
+        **connections.databases['default'],
+        'ENGINE': engine,
+        'CONN_MAX_AGE': 0,
+        'POOL': {'MAX_SIZE': pool_size},
+    }
+    lock = threading.Lock()
+    latencies = []
+
+    def worker(count):
+        wrapper = backend.DatabaseWrapper(settings_dict, 'benchmark')
+        for _ in range(count):
+            started = time.perf_counter()
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            # What Django does at the end of every request
+            wrapper.close()
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(worker, [requests // threads] * threads))
+    wall = time.perf_counter() - started
+    return {
+        'rps': len(latencies) / wall,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+    }
+
+
+def run_pool(args):
+    vendor = connections['default'].vendor
+    if vendor != 'postgresql':
+        raise SystemExit(
+            f'The pool benchmark needs PostgreSQL (DATABASE_URL), '
+            f'not {vendor}.'
+        )
+    plain = measure(PLAIN_ENGINE, args.requests, args.threads, args.pool_size)
+    pooled = measure(
+        POOLED_ENGINE, args.requests, args.threads, args.pool_size
+    )
+    print(f'{"":<10}{"rps":>9}{"p50 ms":>9}{"p95 ms":>9}')
+    for name, row in (('connect', plain), ('pooled', pooled)):
+        print(f'{name:<10}{row["rps"]:>9.1f}{row["p50_ms"]:>9.2f}'
+              f'{row["p95_ms"]:>9.2f}')
+    print(f'Saved per request: {plain["p50_ms"] - pooled["p50_ms"]:.2f} ms '
+          f'(p50), {plain["p95_ms"] - pooled["p95_ms"]:.2f} ms (p95)')
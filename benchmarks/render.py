@@ -0,0 +1,77 @@
+import random
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.template import Engine, engines
+from django.template.context import make_context
+from django.test import RequestFactory
+from django.utils import timezone
+from posts import cards
+from posts.links import attach_urls
+from posts.models import Post
+
+from .run import percentile
+from .seed import WORDS
+
+User = get_user_model()
+
+
+def make_posts(count):
+    """Unsaved posts, like a page of a feed: nothing touches the database."""
+    rng = random.Random(42)
+    authors = [User(id=number, username=f'author_{number}') for number in
+               range(1, 6)]
+    return attach_urls([
+        Post(
+            id=number, author=rng.choice(authors), pub_date=timezone.now(),
+            text=' '.join(rng.choices(WORDS, k=rng.randint(5, 60))),
+            comment_count=rng.randint(0, 50),
+        )
+        for number in range(1, count + 1)
+    ])
+
+
+def render_per_card(engine, request, posts):
+    """What a loop with a render_to_string() per card costs."""
+    for post in posts:
+        template = engine.get_template(cards.CARD_TEMPLATE)
+        template.render(make_context({
+            'post': post, 'author': post.author,
+            'is_post': False, 'is_index': True,
+        }, request))
+
+
+def timed(func, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return percentile(times, 0.5) * 1000
+
+
+def run_render(args):
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    options = settings.TEMPLATES[0]['OPTIONS']
+    uncached = Engine(
+        dirs=settings.TEMPLATES[0]['DIRS'], loaders=settings.TEMPLATE_LOADERS,
+        context_processors=options['context_processors'],
+    )
+    cached = engines.all()[0].engine
+    print(f'{"cards":>6}{"no cache ms":>13}{"per card ms":>13}'
+          f'{"one loop ms":>13}{"saved":>8}')
+    for count in args.cards:
+        posts = make_posts(count)
+        rows = [
+            timed(lambda: render_per_card(uncached, request, posts),
+                  args.repeat),
+            timed(lambda: render_per_card(cached, request, posts),
+                  args.repeat),
+            timed(lambda: cards.render_each(request, posts), args.repeat),
+        ]
+        saved = 1 - rows[2] / rows[0]
+        print(f'{count:>6}' + ''.join(f'{ms:>13.2f}' for ms in rows)
+              + f'{saved:>8.0%}')
@@ -0,0 +1,225 @@
+import io
+import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+from wsgiref.util import setup_testing_defaults
+
+from django.contrib.auth import get_user_model
+from django.test import Client
+from posts.models import Follow, Group, Post
+
+from .seed import USER_PREFIX, WORDS
+
+User = get_user_model()
+
+SAMPLE_SIZE = 200
+QUERIES = re.compile(r'desc="(\d+) queries"')
+CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+class Session:
+    """Cookies and CSRF token of one logged in benchmark user."""
+
+    def __init__(self, app, user):
+        client = Client()
+        client.force_login(user)
+        self.cookies = {'sessionid': client.cookies['sessionid'].value}
+        self.user = user
+        self.csrf_token = ''
+        status, headers, body = call(app, 'GET', '/new/', session=self)
+        for name, value in headers:
+            value = value.strip()
+            if name == 'Set-Cookie' and value.startswith('csrftoken='):
+                self.cookies['csrftoken'] = value.split(';')[0].split('=')[1]
+        match = CSRF_INPUT.search(body.decode())
+        self.csrf_token = match.group(1) if match else ''
+
+    def cookie_header(self):
+        return '; '.join(
+            f'{name}={value}' for name, value in self.cookies.items()
+        )
+
+
+def call(app, method, url, data=None, session=None):
+    """Run one request through the WSGI application."""
+    parts = urlsplit(url)
+    body = urlencode(data or {}).encode()
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': parts.path,
+        'QUERY_STRING': parts.query,
+        'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+    }
+    if session is not None:
+        environ['HTTP_COOKIE'] = session.cookie_header()
+        environ['HTTP_X_CSRFTOKEN'] = session.csrf_token
+    setup_testing_defaults(environ)
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'], response['headers'] = int(status[:3]), headers
+
+    chunks = app(environ, start_response)
+    try:
+        content = b''.join(chunks)
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+    return response['status'], response['headers'], content
+
+
+class Dataset:
+    """Samples of existing objects the scenarios pick URLs from."""
+
+    def __init__(self, app, rng):
+        users = User.objects.filter(username__startswith=USER_PREFIX)
+        readers = list(users.filter(
+            pk__in=Follow.objects.values('user_id')
+        )[:20]) or list(users[:20])
+        if not readers:
+            raise SystemExit('No benchmark users, run the seed command first.')
+        self.usernames = list(users.order_by('pk').values_list(
+            'username', flat=True
+        )[:SAMPLE_SIZE])
+        self.groups = list(
+            Group.objects.values_list('slug', flat=True)[:SAMPLE_SIZE]
+        )
+        self.posts = list(Post.objects.order_by('-pk').values_list(
+            'author__username', 'pk'
+        )[:SAMPLE_SIZE])
+        self.sessions = [Session(app, user) for user in readers]
+        self.rng = rng
+
+    def username(self):
+        return self.rng.choice(self.usernames)
+
+    def post(self):
+        return self.rng.choice(self.posts)
+
+    def session(self):
+        return self.rng.choice(self.sessions)
+
+    def page(self):
+        # Most readers stay on the first pages, some go deep
+        return min(int(self.rng.expovariate(0.3)) + 1, 500)
+
+
+SCENARIOS = {
+    'index': lambda d: ('GET', f'/?page={d.page()}', None, None),
+    'group_posts': lambda d: (
+        'GET', f'/group/{d.rng.choice(d.groups)}/?page={d.page()}', None, None
+    ),
+    'profile': lambda d: ('GET', f'/{d.username()}/', None, None),
+    'post_view': lambda d: ('GET', '/%s/%s/' % d.post(), None, None),
+    'search': lambda d: (
+        'GET', '/search/?' + urlencode({'q': d.rng.choice(WORDS)}), None, None
+    ),
+    'follow_index': lambda d: (
+        'GET', f'/follow/?page={d.page()}', None, d.session()
+    ),
+    'new_post': lambda d: (
+        'POST', '/new/', {'text': 'Benchmark post'}, d.session()
+    ),
+    'add_comment': lambda d: (
+        'POST', '/%s/%s/comment/' % d.post(), {'text': 'Benchmark'},
+        d.session()
+    ),
+}
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * share), len(ordered) - 1)]
+
+
+def measure(app, dataset, name, requests, concurrency):
+    lock, dataset_lock = threading.Lock(), threading.Lock()
+    latencies, queries, errors = [], [], []
+
+    def one_request(_):
+        with dataset_lock:
+            method, url, data, session = SCENARIOS[name](dataset)
+        started = time.perf_counter()
+        status, headers, _ = call(app, method, url, data, session)
+        elapsed = time.perf_counter() - started
+        timing = dict(headers).get('Server-Timing', '')
+        match = QUERIES.search(timing)
+        with lock:
+            latencies.append(elapsed)
+            if match:
+                queries.append(int(match.group(1)))
+            if status >= 400:
+                errors.append(status)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(one_request, range(requests)))
+    wall = time.perf_counter() - started
+    return {
+        'requests': requests,
+        'errors': len(errors),
+        'rps': requests / wall,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'queries_avg': sum(queries) / len(queries) if queries else None,
+    }
+
+
+def run(args):
+    from yatube.wsgi import application
+
+    rng = random.Random(7)
+    dataset = Dataset(application, rng)
+    names = args.scenario or list(SCENARIOS)
+    results = {
+        'meta': {
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'posts': Post.objects.count(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'scenarios': {},
+    }
+    for name in names:
+        results['scenarios'][name] = measure(
+            application, dataset, name, args.requests, args.concurrency
+        )
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['scenarios']
+    report(results['scenarios'], baseline)
+    if args.out:
+        with open(args.out, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+def report(scenarios, baseline=None):
+    print(f'{"scenario":<14}{"rps":>9}{"p50 ms":>9}{"p95 ms":>9}'
+          f'{"p99 ms":>9}{"queries":>9}{"errors":>8}')
+    for name, row in scenarios.items():
+        queries = row['queries_avg']
+        print(f'{name:<14}{row["rps"]:>9.1f}{row["p50_ms"]:>9.1f}'
+              f'{row["p95_ms"]:>9.1f}{row["p99_ms"]:>9.1f}'
+              f'{queries if queries is None else round(queries, 1)!s:>9}'
+              f'{row["errors"]:>8}')
+        if baseline and name in baseline:
+            old = baseline[name]
+            print(f'{"  vs baseline":<14}'
+                  f'{change(row["rps"], old["rps"]):>9}'
+                  f'{change(row["p50_ms"], old["p50_ms"]):>9}'
+                  f'{change(row["p95_ms"], old["p95_ms"]):>9}'
+                  f'{change(row["p99_ms"], old["p99_ms"]):>9}')
+
+
+def change(new, old):
+    if not old:
+        return '-'
+    return f'{(new - old) / old * 100:+.0f}%'
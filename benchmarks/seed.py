@@ -0,0 +1,136 @@
+import itertools
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from mixer.backend.django import Mixer
+from posts import timeline
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+BATCH_SIZE = 5000
+USER_PREFIX = 'bench_'
+WORDS = (
+    'yatube', 'post', 'morning', 'coffee', 'book', 'travel', 'python',
+    'django', 'music', 'city', 'summer', 'friends', 'photo', 'idea',
+    'weekend', 'story', 'code', 'river', 'garden', 'cat', 'film',
+)
+
+mixer = Mixer(commit=False)
+
+
+def seed(users, posts, groups, follows, comments):
+    """Fill the database with a synthetic, skewed Yatube dataset.
+
+    Post authorship and follows follow a Zipf-like law, so a few authors
+    write most posts and have most followers, like on a real network.
+    """
+    rng = random.Random(42)
+    started = time.monotonic()
+    group_ids = step('groups', lambda: seed_groups(groups))
+    user_ids = step('users', lambda: seed_users(users))
+    weights = list(itertools.accumulate(
+        1 / (rank ** 1.1) for rank in range(1, len(user_ids) + 1)
+    ))
+    step('posts', lambda: seed_posts(rng, posts, user_ids, weights, group_ids))
+    step('follows', lambda: seed_follows(rng, follows, user_ids, weights))
+    step('comments', lambda: seed_comments(rng, comments, user_ids))
+    step('counters', lambda: call_command('rebuild_counters'))
+    step('timelines', timeline.rebuild)
+    step('search', lambda: call_command('rebuild_search_index'))
+    cache.clear()
+    print(f'Seeded in {time.monotonic() - started:.0f}s')
+
+
+def step(name, func):
+    started = time.monotonic()
+    result = func()
+    print(f'{name}: {time.monotonic() - started:.1f}s', flush=True)
+    return result
+
+
+def seed_groups(count):
+    existing = Group.objects.filter(slug__startswith=USER_PREFIX).count()
+    new_groups = mixer.cycle(max(count - existing, 0)).blend(
+        Group, slug=mixer.sequence(lambda n: f'{USER_PREFIX}{existing + n}')
+    )
+    Group.objects.bulk_create(new_groups, ignore_conflicts=True)
+    return list(Group.objects.filter(
+        slug__startswith=USER_PREFIX
+    ).values_list('pk', flat=True))
+
+
+def seed_users(count):
+    existing = User.objects.filter(username__startswith=USER_PREFIX).count()
+    for start in range(existing, count, BATCH_SIZE):
+        size = min(BATCH_SIZE, count - start)
+        batch = mixer.cycle(size).blend(
+            User,
+            username=mixer.sequence(
+                lambda n, start=start: f'{USER_PREFIX}{start + n}'
+            ),
+            password='!', is_staff=False, is_superuser=False,
+        )
+        User.objects.bulk_create(batch, ignore_conflicts=True)
+    return list(User.objects.filter(
+        username__startswith=USER_PREFIX
+    ).order_by('pk').values_list('pk', flat=True))
+
+
+def seed_posts(rng, count, user_ids, weights, group_ids):
+    for start in range(0, count, BATCH_SIZE):
+        size = min(BATCH_SIZE, count - start)
+        authors = rng.choices(user_ids, cum_weights=weights, k=size)
+        Post.objects.bulk_create([
+            Post(
+                text=' '.join(rng.choices(WORDS, k=rng.randint(5, 60))),
+                author_id=author_id,
+                group_id=rng.choice(group_ids) if rng.random() < 0.6 else None,
+            )
+            for author_id in authors
+        ])
+        progress('posts', start + size, count)
+
+
+def seed_follows(rng, average, user_ids, weights):
+    batch = []
+    for number, user_id in enumerate(user_ids, start=1):
+        size = min(int(rng.expovariate(1 / average)) + 1, len(user_ids) - 1)
+        authors = set(rng.choices(user_ids, cum_weights=weights, k=size))
+        authors.discard(user_id)
+        batch.extend(
+            Follow(user_id=user_id, author_id=author_id)
+            for author_id in authors
+        )
+        if len(batch) >= BATCH_SIZE:
+            Follow.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+            progress('follows', number, len(user_ids))
+    Follow.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def seed_comments(rng, count, user_ids):
+    post_ids = Post.objects.order_by('pk').values_list('pk', flat=True)
+    first, last = post_ids.first(), post_ids.last()
+    if first is None:
+        return
+    for start in range(0, count, BATCH_SIZE):
+        size = min(BATCH_SIZE, count - start)
+        Comment.objects.bulk_create([
+            Comment(
+                # Newer posts get more comments
+                post_id=last - int((last - first) * rng.random() ** 3),
+                author_id=rng.choice(user_ids),
+                text=' '.join(rng.choices(WORDS, k=rng.randint(3, 20))),
+            )
+            for _ in range(size)
+        ], ignore_conflicts=True)
+        progress('comments', start + size, count)
+
+
+def progress(name, done, total):
+    if done % (BATCH_SIZE * 20) < BATCH_SIZE or done == total:
+        print(f'  {name}: {done}/{total}', flush=True)
@@ -0,0 +1,33 @@
+"""gunicorn settings, read from the working directory by
+`gunicorn yatube.wsgi`.
+
+WEB_CONCURRENCY worker processes with GUNICORN_THREADS threads each. With
+DATABASE_POOL_SIZE set, every worker keeps its own pool of database
+connections, see yatube/db/pool.py. For the async feed views run
+yatube.asgi:application with -k uvicorn.workers.UvicornWorker.
+"""
+import os
+
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+threads = int(os.getenv('GUNICORN_THREADS', 1))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+
+def post_fork(server, worker):
+    # Connections opened by the master (e.g. with --preload) belong to it
+    from yatube.db.postgresql.base import reset_pools
+    reset_pools()
+
+
+def post_worker_init(worker):
+    # Parse the templates now rather than during the first requests
+    from yatube.templates import warm_up
+    compiled, errors = warm_up()
+    for name, error in errors.items():
+        worker.log.error('Template %s is broken: %s', name, error)
+    worker.log.info('Compiled %s templates', len(compiled))
+
+
+def worker_exit(server, worker):
+    from yatube.db.postgresql.base import close_pools
+    close_pools()
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Comment, Follow, Group, Post
+from .models import Comment, Follow, Group, Job, Post
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -14,7 +14,13 @@ class GroupAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
 
 
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'state', 'attempts', 'run_at', 'last_error')
+    list_filter = ('state', 'name')
+
+
 admin.site.register(Group, GroupAdmin)
 admin.site.register(Post, PostAdmin)
 admin.site.register(Follow)
+admin.site.register(Job, JobAdmin)
 admin.register(Comment)
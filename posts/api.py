@@ -0,0 +1,140 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .conditional import make_etag
+from .models import Comment, Group, Post
+from .paginator import CursorPaginator
+from .timeline import TimelinePaginator
+
+User = get_user_model()
+
+COMPACT = {'separators': (',', ':'), 'ensure_ascii': False}
+
+
+def post_data(post):
+    return {
+        'id': post.id,
+        'author': post.author.username,
+        'group': post.group.slug if post.group_id else None,
+        'text': post.text,
+        'pub_date': post.pub_date.isoformat(),
+        'image': post.image.url if post.image else None,
+        'thumbnail': post.thumbnail_url or None,
+        'comment_count': post.comment_count,
+    }
+
+
+def comment_data(comment):
+    return {
+        'id': comment.id,
+        'author': comment.author.username,
+        'text': comment.text,
+        'created': comment.created.isoformat(),
+    }
+
+
+def page_links(request, page):
+    links = {}
+    for name, cursor in (
+        ('next', page.next_cursor), ('previous', page.previous_cursor)
+    ):
+        links[name] = None
+        if cursor:
+            query = request.GET.copy()
+            query['cursor'] = cursor
+            links[name] = request.build_absolute_uri(
+                f'{request.path}?{query.urlencode()}'
+            )
+    return links
+
+
+def conditional_json(request, data, validators, newest):
+    """JsonResponse, or 304 if the client already has this data.
+
+    validators identify the returned objects and their versions, newest
+    is the latest `updated` among them: edits and comments move it, as
+    on the HTML pages.
+    """
+    etag = make_etag(validators)
+    last_modified = int(newest.timestamp()) if newest else None
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = JsonResponse(data, json_dumps_params=COMPACT)
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def feed_response(request, posts=None, paginator=None):
+    paginator = paginator or CursorPaginator(
+        posts.select_related('author', 'group'), settings.POSTS_PER_PAGE
+    )
+    page = paginator.get_page(request.GET.get('cursor'))
+    links = page_links(request, page)
+    return conditional_json(
+        request,
+        {'results': [post_data(post) for post in page], **links},
+        [(post.id, post.version) for post in page] + list(links.values()),
+        max((post.updated for post in page), default=None),
+    )
+
+
+@require_safe
+def index(request):
+    return feed_response(request, Post.objects.all())
+
+
+@require_safe
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return feed_response(request, Post.objects.filter(group=group))
+
+
+@require_safe
+def profile(request, username):
+    user = get_object_or_404(User, username=username)
+    return feed_response(request, Post.objects.filter(author=user))
+
+
+@require_safe
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return JsonResponse(
+            {'detail': 'Authentication required.'}, status=401
+        )
+    return feed_response(request, paginator=TimelinePaginator(
+        request.user, settings.POSTS_PER_PAGE
+    ))
+
+
+@require_safe
+def post_view(request, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), id=post_id
+    )
+    paginator = CursorPaginator(
+        Comment.objects.filter(post=post).select_related('author'),
+        settings.POSTS_COMMENTS_PER_PAGE, ordering=('-created', '-id')
+    )
+    page = paginator.get_page(request.GET.get('cursor'))
+    links = page_links(request, page)
+    return conditional_json(
+        request,
+        {
+            'post': post_data(post),
+            'comments': [comment_data(comment) for comment in page],
+            **links,
+        },
+        [post.id, post.version] + [comment.id for comment in page]
+        + list(links.values()),
+        # A new or deleted comment moves the updated of its post
+        post.updated,
+    )
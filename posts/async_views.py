@@ -0,0 +1,167 @@
+"""Async versions of the read views, served by yatube/asgi.py.
+
+The HTML and context are the same as in posts.views. What differs is
+how the lookups run: the independent ones of a page (the author, the
+follow check, the stats and the page of posts of a profile) are sent to
+worker threads together and awaited with asyncio.gather(), and while
+they or a slow thumbnail wait on the network the event loop serves
+other requests.
+
+The worker threads use connections of their own: run with
+DATABASE_POOL_SIZE (or CONN_MAX_AGE) so they are reused, not opened for
+every lookup.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.views import redirect_to_login
+from django.db import close_old_connections
+from django.shortcuts import get_object_or_404, render
+
+from .conditional import conditional_page
+from .counters import get_stats
+from .forms import CommentForm
+from .links import attach_urls
+from .models import AuthorStats, Comment, Follow, Group, Post
+from .page_cache import cache_anonymous_page
+from .paginator import get_page
+from .timeline import feed, feed_page
+from .views import (
+    get_comments_page, group_state, index_state, post_state, profile_state
+)
+
+User = get_user_model()
+
+
+def _run(func, args, kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # Like at the end of a request: a pooled connection goes back to
+        # the pool, an expired one is closed
+        close_old_connections()
+
+
+async def in_thread(func, *args, **kwargs):
+    """Run a blocking lookup in a worker thread, concurrently with others."""
+    return await sync_to_async(_run, thread_sensitive=False)(
+        func, args, kwargs
+    )
+
+
+async def get_user(request):
+    """request.user, loaded from the session outside the event loop."""
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+async def render_async(request, template_name, context):
+    return await sync_to_async(render)(request, template_name, context)
+
+
+def load_page(request, posts, tag=None):
+    page = get_page(request, posts, tag=tag)
+    # Run the query here rather than while the template renders
+    len(page)
+    return page
+
+
+def load_stats(username):
+    return AuthorStats.objects.filter(user__username=username).first()
+
+
+def is_following(user, username):
+    return Follow.objects.filter(
+        user=user, author__username=username
+    ).exists()
+
+
+async def no_result():
+    return None
+
+
+@cache_anonymous_page('index')
+@conditional_page(index_state)
+async def index(request):
+    post_list = Post.objects.select_related('author', 'group').all()
+    page = await in_thread(load_page, request, post_list, tag='index')
+    return await render_async(request, 'posts/index.html', {
+        'page': page, 'post_list': post_list, 'is_index': True
+    })
+
+
+@cache_anonymous_page('group:{slug}')
+@conditional_page(group_state)
+async def group_posts(request, slug):
+    group_posts = Post.objects.filter(group__slug=slug).select_related(
+        'author', 'group'
+    )
+    group, page = await asyncio.gather(
+        in_thread(get_object_or_404, Group, slug=slug),
+        in_thread(load_page, request, group_posts, tag=f'group:{slug}'),
+    )
+    return await render_async(request, 'posts/group.html', {
+        'group': group, 'page': page, 'group_posts': group_posts,
+        'is_group': True
+    })
+
+
+@cache_anonymous_page('author:{username}')
+@conditional_page(profile_state)
+async def profile(request, username):
+    user = await get_user(request)
+    post_list = Post.objects.filter(
+        author__username=username
+    ).select_related('author', 'group')
+    author, page, stats, following = await asyncio.gather(
+        in_thread(get_object_or_404, User, username=username),
+        in_thread(load_page, request, post_list, tag=f'author:{username}'),
+        in_thread(load_stats, username),
+        (
+            in_thread(is_following, user, username)
+            if user.is_authenticated else no_result()
+        ),
+    )
+    if stats is None:
+        stats = await in_thread(get_stats, author)
+    return await render_async(request, 'posts/profile.html', {
+        'post_list': post_list, 'page': page, 'author': author,
+        'stats': stats, 'is_profile': True, 'following': bool(following)
+    })
+
+
+@cache_anonymous_page('post:{post_id}', 'author:{username}')
+@conditional_page(post_state)
+async def post_view(request, username, post_id):
+    comments = Comment.objects.filter(
+        post_id=post_id, post__author__username=username
+    ).select_related('author')
+    post, comment_page, stats = await asyncio.gather(
+        in_thread(
+            get_object_or_404, Post.objects.select_related('author', 'group'),
+            id=post_id, author__username=username
+        ),
+        in_thread(get_comments_page, comments, request.GET.get('cursor')),
+        in_thread(load_stats, username),
+    )
+    if stats is None:
+        stats = await in_thread(get_stats, post.author)
+    attach_urls([post])
+    return await render_async(request, 'posts/post.html', {
+        'post': post, 'author': post.author, 'comments': comments,
+        'comment_page': comment_page, 'stats': stats,
+        'form': CommentForm(request.POST or None), 'is_post': True
+    })
+
+
+async def follow_index(request):
+    user = await get_user(request)
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+    favor_posts = feed(user).select_related('author', 'group')
+    page = await in_thread(feed_page, request, user)
+    return await render_async(request, 'posts/follow.html', {
+        'favor_posts': favor_posts, 'paginator': page.paginator,
+        'page': page
+    })
@@ -0,0 +1,77 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+LOCK_POLL_INTERVAL = 0.05
+
+
+def _version_key(tag):
+    return f'tag_version:{tag}'
+
+
+def tag_versions(tags):
+    """Current versions of the tags, fetched with one get_many."""
+    keys = [_version_key(tag) for tag in tags]
+    stored = cache.get_many(keys)
+    return [stored.get(key, 0) for key in keys]
+
+
+def versioned_key(key, tags):
+    """Cache key that changes whenever one of the tags is bumped."""
+    versions = '.'.join(str(version) for version in tag_versions(tags))
+    return f'{key}:{versions}'
+
+
+def bump_tags(*tags):
+    """Invalidate every entry stored under versioned_key() with the tags."""
+    for tag in tags:
+        key = _version_key(tag)
+        # add() creates the counter without racing another worker's incr()
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def get_or_set_locked(key, default, timeout=DEFAULT_TIMEOUT):
+    """cache.get_or_set() that lets only one worker rebuild a missing entry.
+
+    The others wait up to CACHE_LOCK_TIMEOUT seconds for the value instead
+    of all running the same expensive query at once.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+    lock_key = f'lock:{key}'
+    if cache.add(lock_key, 1, settings.CACHE_LOCK_TIMEOUT):
+        try:
+            value = default()
+            cache.set(key, value, timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+    deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    return default()
+
+
+def feed_tags(post):
+    """Tags of the feeds a post appears in."""
+    tags = ['index', f'author:{post.author.username}']
+    if post.group_id:
+        tags.append(f'group:{post.group.slug}')
+    return tags
+
+
+def follow_tags(follow):
+    """Tags of the pages showing the follower counters changed by a follow."""
+    return [
+        f'author:{follow.author.username}', f'author:{follow.user.username}'
+    ]
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.functions import Now
+from django.template.context import make_context
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from . import thumbnails
+from .links import attach_urls
+from .models import Post
+
+CARD_TEMPLATE = 'posts/includes/card_post.html'
+
+
+def bump_version(post):
+    """Make the cached cards of the post stale after an edit."""
+    Post.objects.filter(pk=post.pk).update(
+        version=F('version') + 1, updated=Now()
+    )
+
+
+def card_key(post, full_text, own):
+    # The edit link is only shown to the author, the post page shows
+    # the whole text: each combination is a separate card.
+    variant = ('full' if full_text else 'short') + (':own' if own else '')
+    return f'post_card:{post.pk}:{post.version}:{variant}'
+
+
+def iter_cards(request, posts, full_text=False):
+    """Rendered cards of the posts, taken from the cache in one get_many.
+
+    Each card is yielded as soon as it is ready.
+    """
+    posts = list(posts)
+    user_id = request.user.pk if request.user.is_authenticated else None
+    keys = [
+        card_key(post, full_text, post.author_id == user_id)
+        for post in posts
+    ]
+    cards = cache.get_many(keys)
+    missing = [
+        post for key, post in zip(keys, posts) if key not in cards
+    ]
+    thumbnails.resolve(missing)
+    attach_urls(missing)
+    rendered = iter_render(request, missing, full_text)
+    missed = {}
+    for key in keys:
+        if key in cards:
+            card = cards[key]
+        else:
+            card = missed[key] = next(rendered)
+        yield mark_safe(card)
+    if missed:
+        cache.set_many(missed, settings.POSTS_CARD_CACHE_TIMEOUT)
+
+
+def render_each(request, posts, full_text=False):
+    """Card HTML of each post, rendered in one loop.
+
+    Like {% for %} around an {% include %}: the template is looked up
+    and the context processors run once for all the cards, not once per
+    card as render_to_string() would.
+    """
+    return list(iter_render(request, posts, full_text))
+
+
+def iter_render(request, posts, full_text=False):
+    if not posts:
+        return
+    template = get_template(CARD_TEMPLATE).template
+    context = make_context({
+        'is_post': full_text, 'is_index': not full_text
+    }, request)
+    with context.bind_template(template):
+        for post in posts:
+            with context.push(post=post, author=post.author):
+                yield template.render(context)
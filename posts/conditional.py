@@ -0,0 +1,111 @@
+import asyncio
+import hashlib
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+from django.utils.http import http_date
+
+from .paginator import get_page
+
+STATE_FIELDS = ('id', 'pub_date', 'version', 'updated')
+PRIVATE = 'private'
+
+
+def make_etag(validators):
+    """Strong ETag of whatever identifies the content of a response."""
+    return '"{}"'.format(hashlib.md5(repr(validators).encode()).hexdigest())
+
+
+def page_state(request, posts, tag, *fields):
+    """Validators and Last-Modified of the requested page of a feed.
+
+    One query over the posts of the page, with the related fields the
+    page shows joined in. The page count is read from the cache under
+    the feed's tag, like the view itself does.
+    """
+    page = get_page(
+        request, posts.values_list(*STATE_FIELDS, *fields, named=True),
+        tag=tag
+    )
+    if not len(page):
+        return None
+    validators = [page.has_previous(), page.has_next(), *page]
+    if not getattr(page, 'is_cursor', False):
+        validators.append(page.paginator.count)
+    return validators, max(row.updated for row in page)
+
+
+def conditional_page(state):
+    """Conditional GET and HTTP caching headers for an HTML view.
+
+    state(request, *args, **kwargs) returns (validators, last_modified) of
+    the page, or None when they are unknown. Pages of anonymous visitors
+    get ETag, Last-Modified and public caching, repeated requests are
+    answered with 304 after running only state(). Pages of logged in
+    users are private and vary on Cookie. Works with sync and async views.
+    """
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                response, validators = await sync_to_async(_validate)(
+                    request, state, args, kwargs
+                )
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _patch_headers(response, validators)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response, validators = _validate(request, state, args, kwargs)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return _patch_headers(response, validators)
+        return wrapper
+    return decorator
+
+
+def _validate(request, state, args, kwargs):
+    """(304 response or None, validators of the page) before the view.
+
+    The validators are PRIVATE for a logged in user and None when the
+    page has none.
+    """
+    if request.user.is_authenticated:
+        return None, PRIVATE
+    if request.method not in ('GET', 'HEAD'):
+        return None, None
+    current = state(request, *args, **kwargs)
+    if current is None:
+        return None, None
+    validators, last_modified = current
+    etag = make_etag(validators)
+    timestamp = int(last_modified.timestamp())
+    response = get_conditional_response(
+        request, etag=etag, last_modified=timestamp
+    )
+    return response, (etag, timestamp)
+
+
+def _patch_headers(response, validators):
+    if validators is PRIVATE:
+        patch_vary_headers(response, ('Cookie',))
+        patch_cache_control(response, private=True)
+    # Never share a response that sets cookies
+    elif (
+        validators and response.status_code in (200, 304)
+        and not response.cookies
+    ):
+        etag, timestamp = validators
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(timestamp)
+        patch_cache_control(
+            response, public=True, max_age=0,
+            s_maxage=settings.POSTS_SHARED_CACHE_SECONDS
+        )
+    return response
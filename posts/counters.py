@@ -0,0 +1,71 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Now
+
+from .models import AuthorStats, Comment, Follow, Post
+
+STATS_FIELDS = ('followers', 'following', 'posts')
+
+
+def count_stats(user_id):
+    return {
+        'followers': Follow.objects.filter(author_id=user_id).count(),
+        'following': Follow.objects.filter(user_id=user_id).count(),
+        'posts': Post.objects.filter(author_id=user_id).count(),
+    }
+
+
+def get_stats(user):
+    stats = AuthorStats.objects.filter(user=user).first()
+    if stats is None:
+        stats, _ = AuthorStats.objects.get_or_create(
+            user=user, defaults=count_stats(user.pk)
+        )
+    return stats
+
+
+def bump_stats(user_id, **deltas):
+    updated = AuthorStats.objects.filter(user_id=user_id).update(**{
+        field: F(field) + delta for field, delta in deltas.items()
+    })
+    if not updated:
+        # The first change for this author: count from scratch,
+        # the fresh numbers already include this change.
+        AuthorStats.objects.get_or_create(
+            user_id=user_id, defaults=count_stats(user_id)
+        )
+
+
+def bump_comment_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta,
+        version=F('version') + 1, updated=Now()
+    )
+
+
+def _count_subquery(model, field):
+    rows = model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+        field
+    ).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(rows), 0)
+
+
+def stale_comment_counts():
+    return Post.objects.annotate(
+        actual=_count_subquery(Comment, 'post')
+    ).exclude(comment_count=F('actual'))
+
+
+def stale_stats(users):
+    """Users whose stored stats differ from the actual counts."""
+    return users.annotate(
+        actual_followers=_count_subquery(Follow, 'author'),
+        actual_following=_count_subquery(Follow, 'user'),
+        actual_posts=_count_subquery(Post, 'author'),
+        stored_followers=Coalesce('stats__followers', 0),
+        stored_following=Coalesce('stats__following', 0),
+        stored_posts=Coalesce('stats__posts', 0),
+    ).exclude(
+        stored_followers=F('actual_followers'),
+        stored_following=F('actual_following'),
+        stored_posts=F('actual_posts'),
+    )
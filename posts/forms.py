@@ -1,6 +1,8 @@
+from django import forms
 from django.forms import ModelForm
 
-from .models import Comment, Post
+from . import images
+from .models import Comment, Group, Post
 
 
 class PostForm(ModelForm):
@@ -8,6 +10,18 @@ class PostForm(ModelForm):
         model = Post
         fields = ('group', 'text', 'image')
 
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        if image and 'image' in self.changed_data:
+            images.validate(image)
+        return image
+
+    def save(self, commit=True):
+        # The original upload is never stored, only its master
+        if 'image' in self.changed_data:
+            images.store(self.instance, self.cleaned_data['image'])
+        return super().save(commit)
+
 
 class CommentForm(ModelForm):
     class Meta:
@@ -16,3 +30,18 @@ class CommentForm(ModelForm):
         help_texts = {
             'text': 'Enter a comment:',
         }
+
+
+class SearchForm(forms.Form):
+    q = forms.CharField(
+        label='Search', max_length=200,
+        widget=forms.TextInput(attrs={'placeholder': 'Words to find'})
+    )
+    group = forms.ModelChoiceField(
+        Group.objects.all(), required=False, to_field_name='slug',
+        empty_label='All groups'
+    )
+    author = forms.CharField(
+        required=False, max_length=150,
+        widget=forms.TextInput(attrs={'placeholder': 'Author'})
+    )
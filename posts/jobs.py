@@ -0,0 +1,171 @@
+"""Database-backed queue for the side effects of writes.
+
+A write view only saves its rows; what follows from them - timeline
+fan-out, search indexing, thumbnails - is queued as a Job row in the
+same transaction and run after the commit by `manage.py run_jobs`,
+without any broker. With JOBS_ALWAYS_EAGER the jobs run right away in
+the request instead, as they did before the queue.
+
+    @job(batch_size=500)
+    def reindex(payloads):
+        ...
+
+    enqueue(reindex, {'post_id': post.pk}, key=f'reindex:{post.pk}')
+
+A job with a key is dropped while another one with the same key is
+still queued. A failed job is retried with a growing delay up to
+JOBS_MAX_ATTEMPTS times. Handlers must be idempotent: a job may run
+twice if its worker dies halfway.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def job(batch_size=1):
+    """Make a function a job handler.
+
+    A handler gets the payload as keyword arguments. With batch_size > 1
+    it gets a list of up to batch_size payloads of queued jobs instead.
+    """
+    def decorator(func):
+        func.job_name = f'{func.__module__}.{func.__name__}'
+        func.batch_size = batch_size
+        return func
+    return decorator
+
+
+def call(handler, payloads):
+    if handler.batch_size > 1:
+        handler(payloads)
+    else:
+        for payload in payloads:
+            handler(**payload)
+
+
+def enqueue(handler, payload=None, key='', delay=0):
+    """Queue a call of the handler, returns the Job or None."""
+    payload = payload or {}
+    if settings.JOBS_ALWAYS_EAGER:
+        call(handler, [payload])
+        return None
+    if key and Job.objects.filter(key=key, state=Job.QUEUED).exists():
+        return None
+    try:
+        with transaction.atomic():
+            return Job.objects.create(
+                name=handler.job_name, payload=payload, key=key,
+                run_at=timezone.now() + timedelta(seconds=delay)
+            )
+    except IntegrityError:
+        # Another request queued the same key meanwhile
+        return None
+
+
+def claim():
+    """Mark the next due job, with similar ones for a batch, as running.
+
+    Returns (handler, jobs), jobs is empty when nothing is due. Several
+    workers need PostgreSQL: they skip the rows locked by each other.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = Job.objects.filter(state=Job.QUEUED, run_at__lte=now)
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        while True:
+            first = due.first()
+            if first is None:
+                return None, []
+            try:
+                handler = import_string(first.name)
+                break
+            except ImportError as exc:
+                first.state, first.last_error = Job.FAILED, repr(exc)
+                first.save()
+        jobs = [first]
+        if handler.batch_size > 1:
+            jobs += list(due.filter(name=first.name).exclude(
+                pk=first.pk
+            )[:handler.batch_size - 1])
+        Job.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            state=Job.RUNNING, locked_at=now, attempts=F('attempts') + 1
+        )
+    for job in jobs:
+        job.attempts += 1
+    return handler, jobs
+
+
+def run_next():
+    """Run the next due job or batch, returns the number of jobs run."""
+    handler, jobs = claim()
+    if not jobs:
+        return 0
+    try:
+        call(handler, [job.payload for job in jobs])
+    except Exception as exc:
+        logger.exception('Job %s failed', jobs[0].name)
+        for job in jobs:
+            retry(job, repr(exc))
+    else:
+        Job.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+    return len(jobs)
+
+
+def run_pending(limit=None):
+    """Run due jobs until there are none (or limit were run)."""
+    total = 0
+    while limit is None or total < limit:
+        done = run_next()
+        if not done:
+            break
+        total += done
+    return total
+
+
+def retry(job, error):
+    job.last_error = error
+    job.locked_at = None
+    if job.attempts >= settings.JOBS_MAX_ATTEMPTS:
+        job.state = Job.FAILED
+        job.save()
+        return
+    job.run_at = timezone.now() + timedelta(
+        seconds=settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+    )
+    requeue(job)
+
+
+def requeue(job):
+    job.state = Job.QUEUED
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        # A newer job with the same key is queued and will do the work
+        job.delete()
+
+
+def requeue_stale():
+    """Queue again the jobs of workers that died while running them."""
+    stale = Job.objects.filter(
+        state=Job.RUNNING,
+        locked_at__lt=timezone.now() - timedelta(
+            seconds=settings.JOBS_LOCK_TIMEOUT
+        )
+    )
+    count = 0
+    for job in stale:
+        job.locked_at = None
+        requeue(job)
+        count += 1
+    return count
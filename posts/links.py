@@ -0,0 +1,49 @@
+"""URLs of the post cards, built without going through the URL resolver.
+
+reverse() walks the candidate patterns of a name and matches the
+arguments against them on every call, five or six times per card. The
+card URLs all come from fixed patterns of posts/urls.py, so each one is
+reversed once per process with marker arguments into a format string,
+and a card URL costs a str.format().
+"""
+from functools import lru_cache
+from urllib.parse import quote
+
+from django.urls import get_script_prefix, reverse
+
+# Characters reverse() leaves unquoted in arguments: RFC 3986 pchar
+SAFE_CHARS = "!$&'()*+,;=" + '/~:@'
+
+
+@lru_cache(maxsize=None)
+def url_format(name, arity, prefix):
+    # Digits pass both the str and the int converters untouched
+    markers = [f'9021{index}1209' for index in range(arity)]
+    url = reverse(name, args=markers)
+    url = url.replace('{', '{{').replace('}', '}}')
+    for index, marker in enumerate(markers):
+        url = url.replace(marker, f'{{{index}}}')
+    return url
+
+
+def fast_reverse(name, *args):
+    """reverse(name, args=args) for the patterns without regex checks."""
+    return url_format(name, len(args), get_script_prefix()).format(
+        *(quote(str(arg), safe=SAFE_CHARS) for arg in args)
+    )
+
+
+def attach_urls(posts):
+    """Set profile_url, post_url, edit_url and group_url of the posts.
+
+    The posts need their author and group loaded (select_related).
+    """
+    for post in posts:
+        username = post.author.username
+        post.profile_url = fast_reverse('profile', username)
+        post.post_url = fast_reverse('post', username, post.pk)
+        post.edit_url = fast_reverse('post_edit', username, post.pk)
+        post.group_url = (
+            fast_reverse('group', post.group.slug) if post.group_id else ''
+        )
+    return posts
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from yatube.templates import warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        'Compile every template under the template DIRS, fail on a broken '
+        'one. Run it as a build step; workers warm up the same way.'
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        compiled, errors = warm_up()
+        elapsed = (time.perf_counter() - started) * 1000
+        for name, error in errors.items():
+            self.stderr.write(f'{name}: {error}')
+        if errors:
+            raise CommandError(f'{len(errors)} templates are broken.')
+        self.stdout.write(self.style.SUCCESS(
+            f'Compiled {len(compiled)} templates in {elapsed:.0f} ms.'
+        ))
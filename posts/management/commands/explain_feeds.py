@@ -0,0 +1,80 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from posts.models import Comment, Follow, Post, TimelineEntry
+
+
+def feed_queries():
+    """(name, queryset, index the query is meant to use)."""
+    post = Post.objects.order_by().values('id', 'author_id', 'group_id')
+    sample = post.exclude(group=None).first() or post.first() or {
+        'id': 0, 'author_id': 0, 'group_id': 0
+    }
+    follow = Follow.objects.values('user_id', 'author_id').first() or {
+        'user_id': sample['author_id'], 'author_id': sample['author_id']
+    }
+    return (
+        ('index', Post.objects.order_by('-pub_date', '-id')[:10],
+         'post_pub_date_idx'),
+        ('group', Post.objects.filter(group_id=sample['group_id'])[:10],
+         'post_group_pub_date_idx'),
+        ('profile', Post.objects.filter(author_id=sample['author_id'])[:10],
+         'post_author_pub_date_idx'),
+        ('comments', Comment.objects.filter(post_id=sample['id'])[:10],
+         'comment_post_created_idx'),
+        ('follow_lookup', Follow.objects.filter(
+            user_id=follow['user_id'], author_id=follow['author_id']
+        ), 'unique_follow'),
+        ('follow_index', TimelineEntry.objects.filter(
+            user_id=follow['user_id']
+        )[:10], 'timeline_user_pub_date_idx'),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Run EXPLAIN on the feed queries and report whether each one uses '
+        'the index added for it.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help='Print the full query plans.'
+        )
+        parser.add_argument(
+            '--fail', action='store_true',
+            help='Exit with an error if any query misses its index.'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Database: {connection.vendor}')
+        missed = []
+        for name, queryset, index in feed_queries():
+            plan = queryset.explain()
+            if self.uses_index(plan, index):
+                self.stdout.write(self.style.SUCCESS(f'OK    {name}: {index}'))
+            else:
+                missed.append(name)
+                self.stdout.write(self.style.WARNING(
+                    f'MISS  {name}: {index} is not used'
+                ))
+            if options['verbose_plans']:
+                self.stdout.write(plan)
+        if missed and connection.vendor == 'postgresql':
+            self.stdout.write(
+                'PostgreSQL prefers sequential scans on small tables, '
+                'run ANALYZE on a realistic dataset before trusting a MISS.'
+            )
+        if missed and options['fail']:
+            raise CommandError(f'Indexes not used: {", ".join(missed)}')
+
+    def uses_index(self, plan, index):
+        # SQLite: "SEARCH posts_post USING INDEX <name> (...)",
+        # PostgreSQL: "Index Scan using <name> on posts_post".
+        # A unique constraint is backed by an index of the same name on
+        # PostgreSQL and by "sqlite_autoindex_<table>_N" on SQLite.
+        if index in plan:
+            return True
+        return index == 'unique_follow' and (
+            'sqlite_autoindex_posts_follow' in plan
+        )
@@ -0,0 +1,62 @@
+import gzip
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+from posts import transfer
+
+
+def open_text(path, mode):
+    """A file, gzip-compressed for *.gz, or stdin/stdout for '-'."""
+    if path == '-':
+        return sys.stdin if mode == 'r' else sys.stdout
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def guess_format(path, fmt):
+    if fmt:
+        return fmt
+    # str.removesuffix() is Python 3.9+, runtime.txt pins 3.8
+    stem = path[:-3] if path.endswith('.gz') else path
+    return 'csv' if stem.endswith('.csv') else 'ndjson'
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream groups, posts, comments and follows to an NDJSON or CSV '
+        'dump, see posts/transfer.py.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output', nargs='?', default='-',
+            help='File to write, *.gz is compressed (default: stdout).'
+        )
+        parser.add_argument(
+            '--format', choices=('ndjson', 'csv'),
+            help='Dump format (default: by the file extension, ndjson).'
+        )
+
+    def handle(self, *args, **options):
+        path = options['output']
+        fmt = guess_format(path, options['format'])
+        started = time.monotonic()
+        total = 0
+        stream = open_text(path, 'w')
+        try:
+            records = transfer.write_records(
+                transfer.export_records(), stream, fmt
+            )
+            for total, record in enumerate(records, start=1):
+                if total % 100000 == 0:
+                    # stdout may be the dump itself
+                    self.stderr.write(f'{total} records')
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+        elapsed = time.monotonic() - started
+        self.stderr.write(self.style.SUCCESS(
+            f'Exported {total} records in {elapsed:.1f}s.'
+        ))
@@ -0,0 +1,67 @@
+import time
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from posts import timeline, transfer
+
+from .export_posts import guess_format, open_text
+
+
+class Command(BaseCommand):
+    help = (
+        'Load a dump written by export_posts in batches, then rebuild the '
+        'counters, timelines and search index.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'input', help='File to read, *.gz is compressed, - for stdin.'
+        )
+        parser.add_argument(
+            '--format', choices=('ndjson', 'csv'),
+            help='Dump format (default: by the file extension, ndjson).'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=transfer.BATCH_SIZE,
+            help='Rows saved by one bulk_create.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['input']
+        fmt = guess_format(path, options['format'])
+        self.started = self.reported = time.monotonic()
+        importer = transfer.Importer(
+            options['batch_size'], progress=self.progress
+        )
+        stream = open_text(path, 'r')
+        try:
+            counts = importer.run(transfer.read_records(stream, fmt))
+        except (KeyError, ValueError) as exc:
+            raise CommandError(f'Broken dump: {exc!r}')
+        except transfer.RecordError as exc:
+            raise CommandError(f'Broken dump, {exc}')
+        finally:
+            stream.close()
+        self.stdout.write(f'Loaded {self.summary(counts)}, rebuilding...')
+        call_command('rebuild_counters', stdout=self.stdout)
+        timeline.rebuild()
+        call_command('rebuild_search_index', stdout=self.stdout)
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported in {time.monotonic() - self.started:.1f}s.'
+        ))
+
+    def progress(self, counts):
+        now = time.monotonic()
+        if now - self.reported < 5:
+            return
+        self.reported = now
+        rows = sum(counts.values())
+        rate = rows / (now - self.started) * 60
+        self.stdout.write(f'{self.summary(counts)} ({rate:.0f} rows/min)')
+
+    def summary(self, counts):
+        return ', '.join(
+            f'{count} {model}s' for model, count in counts.items() if count
+        ) or 'nothing'
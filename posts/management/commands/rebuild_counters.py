@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from posts.counters import stale_comment_counts, stale_stats
+from posts.models import AuthorStats, Post
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the stored comment counters of posts and the '
+        'followers/following/posts counters of authors.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only report stale counters, exit with an error if any.'
+        )
+
+    def handle(self, *args, **options):
+        posts = stale_comment_counts().only('pk', 'comment_count')
+        users = stale_stats(User.objects.all()).only('pk')
+        if options['check']:
+            stale_posts, stale_users = posts.count(), users.count()
+            self.stdout.write(
+                f'Stale post comment counters: {stale_posts}\n'
+                f'Stale author stats: {stale_users}'
+            )
+            if stale_posts or stale_users:
+                raise CommandError('Counters are out of date.')
+            return
+        fixed_posts = self.fix_posts(posts)
+        fixed_users = self.fix_users(users)
+        self.stdout.write(self.style.SUCCESS(
+            f'Fixed {fixed_posts} post counters '
+            f'and {fixed_users} author stats.'
+        ))
+
+    def fix_posts(self, posts):
+        fixed, batch = 0, []
+        for post in posts.iterator():
+            post.comment_count = post.actual
+            batch.append(post)
+            if len(batch) >= BATCH_SIZE:
+                fixed += self.save_posts(batch)
+                batch = []
+        return fixed + self.save_posts(batch)
+
+    def save_posts(self, batch):
+        Post.objects.bulk_update(batch, ['comment_count'])
+        return len(batch)
+
+    def fix_users(self, users):
+        fixed = 0
+        for user in users.iterator():
+            AuthorStats.objects.update_or_create(user=user, defaults={
+                'followers': user.actual_followers,
+                'following': user.actual_following,
+                'posts': user.actual_posts,
+            })
+            fixed += 1
+        return fixed
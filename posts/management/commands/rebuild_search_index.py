@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from posts import search
+
+
+class Command(BaseCommand):
+    help = (
+        'Index the text of all posts from scratch, e.g. after posts were '
+        'loaded with bulk_create or raw SQL.'
+    )
+
+    def handle(self, *args, **options):
+        search.rebuild()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
@@ -0,0 +1,52 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from posts import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the queued side effects of writes (timeline fan-out, search '
+        'indexing, thumbnails) until stopped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Run the jobs that are due and exit.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=settings.JOBS_POLL_INTERVAL,
+            help='Seconds to sleep while the queue is empty.'
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        total = 0
+        while not self.stopping:
+            close_old_connections()
+            stale = jobs.requeue_stale()
+            if stale:
+                self.stdout.write(f'Requeued {stale} stale jobs')
+            done = 0
+            # Check for a stop between batches, not only when idle
+            while not self.stopping:
+                ran = jobs.run_next()
+                if not ran:
+                    break
+                done += ran
+            total += done
+            if options['once']:
+                break
+            if not done:
+                time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f'Ran {total} jobs.'))
+
+    def stop(self, signum, frame):
+        # Finish the current job and exit
+        self.stopping = True
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from posts import thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Build the card thumbnails of existing posts and store their URLs '
+        'on the posts and in the thumbnail URL cache.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=0,
+            help='Build thumbnails in this many processes (default: inline).'
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Rebuild thumbnails that are already known too.'
+        )
+
+    def handle(self, *args, **options):
+        # Uploads processed into a master have renditions instead
+        posts = Post.objects.exclude(image='').exclude(image=None).filter(
+            image_width__isnull=True
+        )
+        if not options['all']:
+            posts = posts.filter(thumbnail_url='')
+        post_ids = posts.order_by('pk').values_list('pk', flat=True)
+        total = post_ids.count()
+        self.stdout.write(f'Posts to process: {total}')
+        if options['workers']:
+            with thumbnails.make_executor(options['workers']) as executor:
+                done = self.report(executor.map(
+                    thumbnails.build, post_ids.iterator(), chunksize=20
+                ), total)
+        else:
+            done = self.report(
+                map(thumbnails.build, post_ids.iterator()), total
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Built {done} of {total} thumbnails.'
+        ))
+
+    def report(self, results, total):
+        done = 0
+        for number, url in enumerate(results, start=1):
+            done += url is not None
+            if number % 100 == 0:
+                self.stdout.write(f'{number}/{total}')
+        return done
@@ -0,0 +1,169 @@
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.template import TemplateDoesNotExist
+from django.dispatch import receiver
+from django.template.backends.django import DjangoTemplates, Template, reraise
+from yatube.db.pool import connection_checked_out
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """SQL and template timings of a single request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.slowest_sql = ''
+        self.slowest_time = 0.0
+        self.template_time = 0.0
+        self.pool_wait = 0.0
+        self.total_time = 0.0
+        self._render_depth = 0
+        # Async views run the queries of a request in several threads
+        self._lock = threading.Lock()
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                self.queries += 1
+                self.sql_time += duration
+                if duration >= self.slowest_time:
+                    self.slowest_time, self.slowest_sql = duration, sql
+
+    def finish(self):
+        self.total_time = time.perf_counter() - self.started
+
+    def server_timing(self):
+        return ', '.join((
+            f'db;dur={self.sql_time * 1000:.2f};desc="{self.queries} queries"',
+            f'db-slowest;dur={self.slowest_time * 1000:.2f}',
+            f'tpl;dur={self.template_time * 1000:.2f}',
+            f'pool;dur={self.pool_wait * 1000:.2f}',
+            f'total;dur={self.total_time * 1000:.2f}',
+        ))
+
+
+def start_request():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper of every connection, counts for the current request."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics.record_query(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    # Connections of every thread, including the worker threads the
+    # async views run their lookups in
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(connection_checked_out)
+def record_pool_wait(sender, wait, **kwargs):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.pool_wait += wait
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(context, request)
+        # Only the outermost render is timed, nested render_to_string
+        # calls are already part of it.
+        metrics._render_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics._render_depth -= 1
+            if not metrics._render_depth:
+                metrics.template_time += time.perf_counter() - start
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Django template backend that reports render time to RequestMetrics."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(
+                self.engine.get_template(template_name), self
+            )
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class RollingSummary:
+    """Last N requests of every URL name, kept in process memory."""
+
+    def __init__(self, size):
+        self.size = size
+        self._samples = defaultdict(lambda: deque(maxlen=self.size))
+        self._lock = threading.Lock()
+
+    def add(self, url_name, metrics):
+        with self._lock:
+            self._samples[url_name].append((
+                metrics.queries, metrics.sql_time, metrics.template_time,
+                metrics.total_time, metrics.slowest_time, metrics.slowest_sql,
+                metrics.pool_wait,
+            ))
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def report(self):
+        with self._lock:
+            samples = {
+                name: list(rows) for name, rows in self._samples.items()
+            }
+        report = {}
+        for name, rows in samples.items():
+            totals = sorted(row[3] for row in rows)
+            slowest = max(rows, key=lambda row: row[4])
+            report[name] = {
+                'requests': len(rows),
+                'queries_avg': sum(row[0] for row in rows) / len(rows),
+                'queries_max': max(row[0] for row in rows),
+                'sql_ms_avg': sum(row[1] for row in rows) / len(rows) * 1000,
+                'template_ms_avg': (
+                    sum(row[2] for row in rows) / len(rows) * 1000
+                ),
+                'total_ms_p50': totals[len(totals) // 2] * 1000,
+                'total_ms_p95': totals[int(len(totals) * 0.95)] * 1000,
+                'pool_wait_ms_avg': (
+                    sum(row[6] for row in rows) / len(rows) * 1000
+                ),
+                'slowest_query_ms': slowest[4] * 1000,
+                'slowest_query': slowest[5],
+            }
+        return report
+
+
+summary = RollingSummary(settings.PERFORMANCE_SUMMARY_SIZE)
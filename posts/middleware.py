@@ -0,0 +1,67 @@
+import asyncio
+import logging
+
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PerformanceMiddleware:
+    """Counts SQL queries and times SQL and templates for every request.
+
+    The numbers are sent in the Server-Timing header and added to the
+    in-process metrics.summary, keyed by the resolved URL name. Queries
+    are counted by metrics.record_query on every connection.
+
+    Of a streamed response only the part before the first byte is
+    measured: its header says so and its query budget is not checked.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Mark the instance as a coroutine function for the ASGI handler
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        request_metrics, token = metrics.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.process_metrics(request, response, request_metrics)
+
+    async def __acall__(self, request):
+        request_metrics, token = metrics.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.process_metrics(request, response, request_metrics)
+
+    def process_metrics(self, request, response, request_metrics):
+        request_metrics.finish()
+        server_timing = request_metrics.server_timing()
+        if response.streaming:
+            server_timing += ', stream;desc="until the first byte"'
+        response['Server-Timing'] = server_timing
+        url_name = getattr(request.resolver_match, 'view_name', None)
+        if url_name:
+            metrics.summary.add(url_name, request_metrics)
+            if not response.streaming:
+                self.check_budget(url_name, request_metrics)
+        return response
+
+    def check_budget(self, url_name, request_metrics):
+        budget = settings.QUERY_BUDGETS.get(url_name)
+        if budget is not None and request_metrics.queries > budget:
+            logger.warning(
+                'View %s ran %s queries, the budget is %s',
+                url_name, request_metrics.queries, budget
+            )
@@ -0,0 +1,60 @@
+# Generated by Django 3.2.15 on 2026-10-18 02:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    Follow = apps.get_model('posts', 'Follow')
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+    User = apps.get_model('auth', 'User')
+
+    def total(model, field):
+        rows = model.objects.filter(**{field: OuterRef('pk')}).order_by(
+        ).values(field).annotate(total=Count('pk')).values('total')
+        return Coalesce(Subquery(rows), 0)
+
+    Post.objects.update(comment_count=total(Comment, 'post'))
+    users = User.objects.annotate(
+        followers_total=total(Follow, 'author'),
+        following_total=total(Follow, 'user'),
+        posts_total=total(Post, 'author'),
+    ).values_list(
+        'pk', 'followers_total', 'following_total', 'posts_total'
+    )
+    AuthorStats.objects.bulk_create([
+        AuthorStats(
+            user_id=pk, followers=followers, following=following, posts=posts
+        )
+        for pk, followers, following, posts in users.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('posts', '0002_timelineentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='auth.user')),
+                ('followers', models.PositiveIntegerField(default=0)),
+                ('following', models.PositiveIntegerField(default=0)),
+                ('posts', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    # Vendor-specific: a tsvector column with a GIN index on PostgreSQL,
+    # a FTS5 table keyed by post id on SQLite, nothing elsewhere.
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'ALTER TABLE posts_post ADD COLUMN search_vector tsvector'
+        )
+        schema_editor.execute(
+            "UPDATE posts_post SET search_vector = to_tsvector('simple', text)"
+        )
+        schema_editor.execute(
+            'CREATE INDEX post_search_vector_idx ON posts_post '
+            'USING GIN (search_vector)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE posts_post_fts USING fts5(text)'
+        )
+        schema_editor.execute(
+            'INSERT INTO posts_post_fts (rowid, text) '
+            'SELECT id, text FROM posts_post'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'ALTER TABLE posts_post DROP COLUMN search_vector'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE posts_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_post_thumbnail_url'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.15 on 2026-10-18 03:01
+
+from django.db import migrations, models
+import yatube.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=yatube.storage.get_media_storage, upload_to='posts/'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.db import models
-from storages.backends.s3boto3 import S3Boto3Storage
+from django.utils import timezone
+from yatube.storage import get_media_storage
 
 User = get_user_model()
 
@@ -25,14 +26,60 @@ class Post(models.Model):
         related_name='posts', verbose_name='Group',
         help_text='Choose a group'
     )
-    image = models.ImageField(storage=S3Boto3Storage(location='media'), blank=True, null=True)
+    image = models.ImageField(
+        storage=get_media_storage, upload_to='posts/', blank=True, null=True
+    )
+    # Size of the master and the renditions written by posts.images
+    image_width = models.PositiveIntegerField(
+        blank=True, null=True, editable=False
+    )
+    image_height = models.PositiveIntegerField(
+        blank=True, null=True, editable=False
+    )
+    renditions = models.JSONField(default=list, blank=True, editable=False)
+    # Filled by posts.thumbnails in the background after an upload
+    thumbnail_url = models.CharField(
+        max_length=500, blank=True, editable=False
+    )
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    # Bumped on every edit and comment, part of the cached card key
+    version = models.PositiveIntegerField(default=1, editable=False)
+    # Moved together with version, the Last-Modified of pages showing the post
+    updated = models.DateTimeField('date updated', auto_now=True)
+
+    COUNTER_FIELDS = ('comment_count', 'version')
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'), name='post_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'), name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=('group', '-pub_date'), name='post_group_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:15]
 
+    def save(self, *args, **kwargs):
+        # comment_count and version only move by F() updates: a full save
+        # of an instance loaded before one of them must not undo it
+        if (
+            not self._state.adding and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -46,6 +93,11 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('-created',)
+        indexes = (
+            models.Index(
+                fields=('post', '-created'), name='comment_post_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:15]
@@ -59,5 +111,88 @@ class Follow(models.Model):
         User, on_delete=models.CASCADE, related_name='following'
     )
 
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'), name='unique_follow'
+            ),
+        )
+
     def __str__(self):
         return f'Follower: {self.user}, Favourite author: {self.author}'
+
+
+class AuthorStats(models.Model):
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True,
+        related_name='stats'
+    )
+    followers = models.PositiveIntegerField(default=0)
+    following = models.PositiveIntegerField(default=0)
+    posts = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'Stats of {self.user}'
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='timeline_entries'
+    )
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name='timeline_entries'
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ('-pub_date',)
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'), name='unique_timeline_entry'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date'), name='timeline_user_pub_date_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'Timeline of {self.user}: {self.post}'
+
+
+class Job(models.Model):
+    """A side effect of a write queued for `manage.py run_jobs`."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+
+    # Dotted path of a function decorated with posts.jobs.job()
+    name = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict)
+    # Only one queued job per key, later duplicates are dropped
+    key = models.CharField(max_length=200, blank=True)
+    state = models.CharField(max_length=10, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ('run_at', 'id')
+        constraints = (
+            models.UniqueConstraint(
+                fields=('key',),
+                condition=models.Q(state='queued') & ~models.Q(key=''),
+                name='unique_queued_job_key'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('state', 'run_at'), name='job_state_run_at_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} ({self.state})'
@@ -0,0 +1,96 @@
+import asyncio
+import hashlib
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe, urlencode
+
+from .caching import versioned_key
+
+# The only query parameters the cached views read
+PAGE_PARAMS = ('page', 'cursor')
+
+
+def page_key(request, tags):
+    """Key of the path and the PAGE_PARAMS of the request.
+
+    Other parameters (?utm_source=...) don't change the page, they share
+    its entry instead of adding one per distinct query string.
+    """
+    query = urlencode([
+        (name, request.GET[name]) for name in PAGE_PARAMS
+        if name in request.GET
+    ])
+    path = hashlib.md5(f'{request.path}?{query}'.encode()).hexdigest()
+    return versioned_key(f'page:{path}', tags)
+
+
+def cache_anonymous_page(*tags):
+    """Full-page cache of a view for anonymous visitors.
+
+    Pages are keyed by path and page parameters and stored under the tags,
+    formatted with the URL kwargs ('group:{slug}'), so bump_tags() purges
+    them. A cached page answers conditional requests by itself, without
+    running the view or any query. Works with sync and async views.
+
+    A page that will be cached is marked by request.page_cached, so that
+    render_page() renders it whole instead of streaming it.
+    """
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                response, key = await sync_to_async(_lookup)(
+                    request, tags, kwargs
+                )
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                    response = await sync_to_async(_store)(key, response)
+                return response
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response, key = _lookup(request, tags, kwargs)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                response = _store(key, response)
+            return response
+        return wrapper
+    return decorator
+
+
+def _lookup(request, tags, kwargs):
+    """(cached response or None, cache key or None if not cacheable)."""
+    if (
+        not settings.POSTS_PAGE_CACHE_TIMEOUT
+        or request.method not in ('GET', 'HEAD')
+        or request.user.is_authenticated
+    ):
+        return None, None
+    request.page_cached = True
+    key = page_key(request, [tag.format(**kwargs) for tag in tags])
+    response = cache.get(key)
+    if response is not None:
+        response = get_conditional_response(
+            request,
+            etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(response.get('Last-Modified')),
+            response=response,
+        )
+    return response, key
+
+
+def _store(key, response):
+    """Cache the response if it can be shared, returns the response."""
+    # Never share a response that sets cookies. A stream can't be pickled
+    # without reading it into memory: it is sent as it is.
+    if (
+        key and response.status_code == 200 and not response.cookies
+        and not response.streaming
+    ):
+        cache.set(key, response, settings.POSTS_PAGE_CACHE_TIMEOUT)
+    return response
@@ -0,0 +1,208 @@
+import base64
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .caching import get_or_set_locked, versioned_key
+
+CURSOR_MODE = 'cursor'
+
+
+def encode_cursor(values, direction):
+    payload = json.dumps(
+        [direction] + [_dump(value) for value in values],
+        separators=(',', ':')
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, fields=None):
+    """Return (direction, values), or None for a malformed cursor.
+
+    With the model fields of the values each one is converted by its
+    field: a cursor of the wrong length or types is malformed too, rather
+    than an error in the query.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction, *values = payload
+        values = [_load(value) for value in values]
+        if fields is not None:
+            if len(values) != len(fields):
+                return None
+            values = [
+                field.to_python(value)
+                for field, value in zip(fields, values)
+            ]
+    except (ValueError, TypeError, ValidationError):
+        return None
+    if direction not in ('next', 'prev'):
+        return None
+    if any(value is None for value in values):
+        return None
+    return direction, values
+
+
+def _dump(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+
+def _load(value):
+    if isinstance(value, dict):
+        if value.keys() != {'dt'} or not isinstance(value['dt'], str):
+            raise ValueError('Not a datetime')
+        return datetime.fromisoformat(value['dt'])
+    if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+        raise ValueError('Not a cursor value')
+    return value
+
+
+class CursorPage:
+    """Page of a feed without a number: links only to adjacent pages."""
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor, previous_cursor, paginator):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.paginator = paginator
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset pagination over the ordering fields (pub_date, id by default).
+
+    Unlike django.core.paginator.Paginator it runs no COUNT(*) and no
+    OFFSET, so a deep page costs the same as the first one.
+    """
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = ordering
+        self.fields = [field.lstrip('-') for field in ordering]
+        self.descending = ordering[0].startswith('-')
+
+    @cached_property
+    def model_fields(self):
+        """Fields of the ordering values, annotations (rank) included."""
+        query = self.object_list.query
+        return [
+            query.annotations[name].output_field
+            if name in query.annotations
+            else self.object_list.model._meta.get_field(name)
+            for name in self.fields
+        ]
+
+    def get_page(self, cursor=None):
+        decoded = decode_cursor(cursor, self.model_fields) if cursor else None
+        direction, values = decoded or ('next', None)
+        forward = direction == 'next'
+        rows = self.fetch(values, forward)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+        if forward:
+            has_next, has_previous = has_more, values is not None
+        else:
+            has_next, has_previous = True, has_more
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor(self._key(rows[-1]), 'next')
+        if rows and has_previous:
+            previous_cursor = encode_cursor(self._key(rows[0]), 'prev')
+        return CursorPage(rows, next_cursor, previous_cursor, self)
+
+    def fetch(self, values, forward):
+        """Up to per_page + 1 objects after the values, in walking order."""
+        queryset = self.object_list
+        if values is not None:
+            queryset = queryset.filter(self._keyset_filter(values, forward))
+        if forward:
+            queryset = queryset.order_by(*self.ordering)
+        else:
+            queryset = queryset.order_by(*self._reversed_ordering())
+        return list(queryset[:self.per_page + 1])
+
+    def _key(self, obj):
+        return [getattr(obj, field) for field in self.fields]
+
+    def _reversed_ordering(self):
+        return [
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in self.ordering
+        ]
+
+    def _keyset_filter(self, values, forward, fields=None):
+        # (a, b) < (x, y)  <=>  a < x OR (a = x AND b < y)
+        fields = fields or self.fields
+        lookup = 'lt' if forward == self.descending else 'gt'
+        condition = Q()
+        for position, field in enumerate(fields):
+            step = Q(**{f'{field}__{lookup}': values[position]})
+            for previous, value in zip(fields, values[:position]):
+                step &= Q(**{previous: value})
+            condition |= step
+        return condition
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that keeps the COUNT(*) of a feed in the shared cache.
+
+    The count is stored under the feed's tag and dropped by bump_tags().
+    """
+
+    def __init__(self, object_list, per_page, tag, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.tag = tag
+
+    @cached_property
+    def count(self):
+        key = versioned_key(f'feed_count:{self.tag}', [self.tag])
+        return get_or_set_locked(
+            key, self.object_list.count, settings.POSTS_COUNT_CACHE_TIMEOUT
+        )
+
+
+def get_page(request, object_list, mode=None, tag=None):
+    """Page of a feed in the mode set by the POSTS_PAGINATION setting.
+
+    With a tag the page count of numbered pages is cached under it.
+    """
+    mode = mode or settings.POSTS_PAGINATION
+    if mode == CURSOR_MODE:
+        paginator = CursorPaginator(object_list, settings.POSTS_PER_PAGE)
+        return paginator.get_page(request.GET.get('cursor'))
+    if tag:
+        paginator = CachedCountPaginator(
+            object_list, settings.POSTS_PER_PAGE, tag
+        )
+    else:
+        paginator = Paginator(object_list, settings.POSTS_PER_PAGE)
+    return paginator.get_page(request.GET.get('page'))
@@ -0,0 +1,113 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Value
+from django.db.models.expressions import RawSQL
+
+from .jobs import job
+from .models import Post
+
+# The index is created by migration 0007_search_index: a tsvector column
+# with a GIN index on PostgreSQL, a FTS5 table keyed by post id on SQLite.
+# Posts are written in many languages: no stemming, words match as typed.
+TS_CONFIG = 'simple'
+FTS_TABLE = 'posts_post_fts'
+
+WORD_RE = re.compile(r'\w+')
+
+
+def rebuild(db=connection):
+    """Index the text of all posts from scratch."""
+    with db.cursor() as cursor:
+        if db.vendor == 'postgresql':
+            cursor.execute(
+                'UPDATE posts_post SET search_vector = to_tsvector(%s, text)',
+                [TS_CONFIG]
+            )
+        elif db.vendor == 'sqlite':
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text) '
+                'SELECT id, text FROM posts_post'
+            )
+
+
+def index_posts(post_ids):
+    """Index the current text of the posts, drop the deleted ones."""
+    post_ids = list(post_ids)
+    if not post_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(post_ids))
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'UPDATE posts_post SET search_vector = to_tsvector(%s, text) '
+                f'WHERE id IN ({placeholders})', [TS_CONFIG, *post_ids]
+            )
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})',
+                post_ids
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text) '
+                f'SELECT id, text FROM posts_post '
+                f'WHERE id IN ({placeholders})',
+                post_ids
+            )
+
+
+@job(batch_size=500)
+def reindex(payloads):
+    """Queued (re)indexing of saved and deleted posts, in batches."""
+    index_posts({payload['post_id'] for payload in payloads})
+
+
+def search(query, group=None, author=None):
+    """Posts matching every word of the query, annotated with a rank.
+
+    group and author narrow the results down by group slug and username.
+
+    A higher rank is a better match; order by ('-rank', '-id') to get
+    the best results first with stable cursors.
+    """
+    words = WORD_RE.findall(query)
+    posts = Post.objects.all()
+    if group:
+        posts = posts.filter(group__slug=group)
+    if author:
+        posts = posts.filter(author__username=author)
+    if not words:
+        return posts.none().annotate(
+            rank=Value(0.0, output_field=FloatField())
+        )
+    if connection.vendor == 'postgresql':
+        tsquery = 'plainto_tsquery(%s, %s)'
+        params = [TS_CONFIG, ' '.join(words)]
+        return posts.filter(RawSQL(
+            f'posts_post.search_vector @@ {tsquery}', params,
+            output_field=BooleanField()
+        )).annotate(rank=RawSQL(
+            # ts_rank() is a real: as a double precision the rank in the
+            # cursor compares equal to the one recomputed by the query
+            f'ts_rank(posts_post.search_vector, {tsquery})::float8', params,
+            output_field=FloatField()
+        ))
+    if connection.vendor == 'sqlite':
+        # Every word is quoted, so FTS5 query syntax in the input is inert
+        match = ' '.join('"{}"'.format(word) for word in words)
+        # The FTS table is joined once: MATCH drives the query and the
+        # posts are found by rowid. bm25() is lower for better matches.
+        return posts.extra(
+            tables=[FTS_TABLE],
+            where=[
+                f'{FTS_TABLE}.rowid = posts_post.id',
+                f'{FTS_TABLE} MATCH %s',
+            ],
+            params=[match],
+        ).annotate(rank=RawSQL(
+            f'-bm25({FTS_TABLE})', [], output_field=FloatField()
+        ))
+    for word in words:
+        posts = posts.filter(text__icontains=word)
+    return posts.annotate(rank=Value(0.0, output_field=FloatField()))
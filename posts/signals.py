@@ -0,0 +1,81 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import caching, cards, counters, images, search, timeline
+from .jobs import enqueue
+from .models import Comment, Follow, Post
+
+
+@receiver(pre_save, sender=Post)
+def post_saving(sender, instance, **kwargs):
+    if not instance._state.adding:
+        # The group may change on edit: the old group's feed is stale too
+        instance._previous_group_slug = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group__slug', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.bump_stats(instance.author_id, posts=1)
+        enqueue(timeline.fan_out_post, {'post_id': instance.pk})
+    else:
+        cards.bump_version(instance)
+    images.saved(instance)
+    reindex(instance.pk)
+    tags = caching.feed_tags(instance) + [f'post:{instance.pk}']
+    previous_group = getattr(instance, '_previous_group_slug', None)
+    if previous_group:
+        tags.append(f'group:{previous_group}')
+    caching.bump_tags(*tags)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.bump_stats(instance.author_id, posts=-1)
+    reindex(instance.pk)
+    caching.bump_tags(*caching.feed_tags(instance), f'post:{instance.pk}')
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.bump_comment_count(instance.post_id, 1)
+        caching.bump_tags(f'post:{instance.post_id}')
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.bump_comment_count(instance.post_id, -1)
+    caching.bump_tags(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.bump_stats(instance.author_id, followers=1)
+        counters.bump_stats(instance.user_id, following=1)
+        enqueue(timeline.backfill_follow, follow_payload(instance))
+        caching.bump_tags(*caching.follow_tags(instance))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.bump_stats(instance.author_id, followers=-1)
+    counters.bump_stats(instance.user_id, following=-1)
+    enqueue(timeline.trim_follow, follow_payload(instance))
+    if timeline.left_prolific(instance.author_id):
+        enqueue(
+            timeline.fan_out_author, {'author_id': instance.author_id},
+            key=f'fan_out_author:{instance.author_id}'
+        )
+    caching.bump_tags(*caching.follow_tags(instance))
+
+
+def reindex(post_id):
+    enqueue(search.reindex, {'post_id': post_id}, key=f'reindex:{post_id}')
+
+
+def follow_payload(follow):
+    return {'user_id': follow.user_id, 'author_id': follow.author_id}
@@ -0,0 +1,73 @@
+"""Pages sent in pieces: the layout first, then the cards one by one.
+
+With POSTS_STREAM_PAGES render_page() answers with a
+StreamingHttpResponse. The page template is rendered as usual except
+for the tags that produce long lists ({% post_cards %} and
+{% comment_cards %}): they leave a marker in the HTML and hand over a
+generator of their items. The HTML up to the first marker - head, nav,
+author info - is the first chunk sent, and each card is rendered only
+when the client is ready for it, so the whole page never sits in memory.
+
+PerformanceMiddleware only sees the part rendered before the first
+byte: it marks the Server-Timing header of a stream as partial and does
+not check its query budget. A page the anonymous page cache is going to
+store is rendered whole, not streamed.
+"""
+import re
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.shortcuts import render
+from django.template import Context
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+STREAM_KEY = '_stream'
+MARKER = '<!--stream:{}-->'
+MARKER_RE = re.compile(r'<!--stream:(\d+)-->')
+
+
+def render_page(request, template_name, context):
+    """render(), or a streamed page with POSTS_STREAM_PAGES."""
+    if not settings.POSTS_STREAM_PAGES or getattr(
+        request, 'page_cached', False
+    ):
+        return render(request, template_name, context)
+    parts = []
+    html = get_template(template_name).render(
+        {**context, STREAM_KEY: parts}, request
+    )
+    return StreamingHttpResponse(join_parts(html, parts))
+
+
+def join_parts(html, parts):
+    pieces = MARKER_RE.split(html)
+    yield pieces[0]
+    for index, piece in zip(pieces[1::2], pieces[2::2]):
+        yield from parts[int(index)]
+        yield piece
+
+
+def defer(context, chunks):
+    """HTML of the chunks, or a marker for them in a streamed render."""
+    parts = context.get(STREAM_KEY)
+    if parts is None:
+        return mark_safe(''.join(chunks))
+    parts.append(chunks)
+    return mark_safe(MARKER.format(len(parts) - 1))
+
+
+def iter_include(context, template_name, items, name):
+    """{% for name in items %}{% include template_name %}, item by item."""
+    template = context.template.engine.get_template(template_name)
+    if STREAM_KEY in context:
+        # The items are rendered after the page, when the variables of
+        # its blocks and includes are gone: keep a copy of them.
+        context = Context(context.flatten(), autoescape=context.autoescape)
+    return render_items(template, context, items, name)
+
+
+def render_items(template, context, items, name):
+    for item in items:
+        with context.push({name: item}):
+            yield template.render(context)
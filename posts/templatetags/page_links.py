@@ -0,0 +1,17 @@
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def page_url(context, **params):
+    """Query string of the current page pointing to another page of it.
+
+    Other parameters, e.g. the search query, are kept.
+    """
+    query = context['request'].GET.copy()
+    for name in ('page', 'cursor'):
+        query.pop(name, None)
+    query.update(params)
+    return '?' + query.urlencode()
+
@@ -0,0 +1,24 @@
+from django import template
+
+from .. import images
+from ..cards import iter_cards
+from ..streaming import defer, iter_include
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts):
+    return defer(context, iter_cards(context['request'], posts))
+
+
+@register.simple_tag(takes_context=True)
+def comment_cards(context, comments):
+    return defer(context, iter_include(
+        context, 'posts/includes/comment.html', comments, 'item'
+    ))
+
+
+@register.inclusion_tag('posts/includes/picture.html')
+def post_picture(post):
+    return images.picture(post)
@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from posts.models import Comment, Follow, Group, Post
+
+from .utils import QueryBudgetMixin
+
+User = get_user_model()
+
+
+class ApiTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='API', slug='api_group', description='Описание'
+        )
+        cls.author = User.objects.create_user(username='api_author')
+        cls.reader = User.objects.create_user(username='api_reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.post = Post.objects.create(
+            text='Пост для API', author=cls.author, group=cls.group
+        )
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ApiTests.reader)
+
+    def test_feeds_return_posts(self):
+        """Ленты API отдают посты в JSON без лишних запросов."""
+        urls = (
+            reverse('api:index'),
+            reverse('api:group', kwargs={'slug': ApiTests.group.slug}),
+            reverse('api:profile', kwargs={
+                'username': ApiTests.author.username
+            }),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.assertWithinQueryBudget(self.guest_client, url)
+                post = response.json()['results'][0]
+                self.assertEqual(
+                    (post['id'], post['author'], post['group']),
+                    (ApiTests.post.id, 'api_author', 'api_group')
+                )
+        response = self.assertWithinQueryBudget(
+            self.authorized_client, reverse('api:follow_index')
+        )
+        self.assertEqual(len(response.json()['results']), 1)
+        response = self.guest_client.get(reverse('api:follow_index'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_post_with_comments(self):
+        """Пост в API отдается вместе с комментариями."""
+        response = self.assertWithinQueryBudget(
+            self.guest_client,
+            reverse('api:post', kwargs={'post_id': ApiTests.post.id})
+        )
+        data = response.json()
+        self.assertEqual(data['post']['comment_count'], 1)
+        self.assertEqual(data['comments'][0]['text'], 'Комментарий')
+
+    def test_unchanged_feed_returns_not_modified(self):
+        """Неизменная лента отдает 304, новый пост меняет ETag."""
+        url = reverse('api:index')
+        response = self.guest_client.get(url)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+        not_modified = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+        Post.objects.create(text='Новый пост', author=ApiTests.author)
+        modified = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(modified.status_code, 200)
+        self.assertNotEqual(modified['ETag'], etag)
+
+    def test_edit_moves_last_modified(self):
+        """Правка поста сдвигает Last-Modified: запрос только с
+        If-Modified-Since получает новые данные."""
+        url = reverse('api:post', kwargs={'post_id': ApiTests.post.id})
+        last_modified = self.guest_client.get(url)['Last-Modified']
+        Post.objects.filter(pk=ApiTests.post.pk).update(
+            text='Исправленный текст',
+            updated=timezone.now() + timedelta(minutes=1)
+        )
+        for url in (url, reverse('api:index')):
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=last_modified
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Исправленный текст')
+
+    def test_new_comment_changes_post_etag(self):
+        """Новый комментарий меняет ETag поста."""
+        url = reverse('api:post', kwargs={'post_id': ApiTests.post.id})
+        etag = self.guest_client.get(url)['ETag']
+        Comment.objects.create(
+            post=ApiTests.post, author=ApiTests.author, text='Ответ'
+        )
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
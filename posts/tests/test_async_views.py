@@ -0,0 +1,83 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import Http404
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from posts import async_views, views
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(POSTS_PAGE_CACHE_TIMEOUT=0)
+class AsyncViewsTests(TransactionTestCase):
+    # The lookups run in worker threads with connections of their own,
+    # they only see committed rows
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.group = Group.objects.create(
+            title='Асинхронная', slug='async', description='Описание'
+        )
+        self.author = User.objects.create_user(username='async_author')
+        self.reader = User.objects.create_user(username='async_reader')
+        self.post = Post.objects.create(
+            text='Асинхронный пост', author=self.author, group=self.group
+        )
+        self.kwargs = {
+            'index': {},
+            'group_posts': {'slug': self.group.slug},
+            'profile': {'username': self.author.username},
+            'post_view': {
+                'username': self.author.username, 'post_id': self.post.id
+            },
+        }
+
+    def get(self, view, user=None, **kwargs):
+        request = self.factory.get('/')
+        request.user = user or AnonymousUser()
+        if asyncio.iscoroutinefunction(view):
+            return async_to_sync(view)(request, **kwargs)
+        return view(request, **kwargs)
+
+    def test_pages_match_sync_views(self):
+        """Асинхронные страницы совпадают с синхронными."""
+        for name, kwargs in self.kwargs.items():
+            with self.subTest(view=name):
+                expected = self.get(getattr(views, name), **kwargs)
+                response = self.get(getattr(async_views, name), **kwargs)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Асинхронный пост')
+                self.assertEqual(response.content, expected.content)
+                self.assertEqual(response['ETag'], expected['ETag'])
+
+    def test_missing_objects_are_not_found(self):
+        """Несуществующие группа, автор и пост дают 404."""
+        cases = (
+            (async_views.group_posts, {'slug': 'missing'}),
+            (async_views.profile, {'username': 'missing'}),
+            (async_views.post_view, {
+                'username': self.reader.username, 'post_id': self.post.id
+            }),
+        )
+        for view, kwargs in cases:
+            with self.subTest(kwargs=kwargs):
+                with self.assertRaises(Http404):
+                    self.get(view, **kwargs)
+
+    def test_follow_feed(self):
+        """Лента подписок доступна только пользователю и показывает посты
+        авторов, на которых он подписан."""
+        response = self.get(async_views.follow_index)
+        self.assertEqual(response.status_code, 302)
+        Follow.objects.create(user=self.reader, author=self.author)
+        response = self.get(async_views.follow_index, user=self.reader)
+        self.assertContains(response, 'Асинхронный пост')
+        response = self.get(
+            async_views.profile, user=self.reader,
+            username=self.author.username
+        )
+        self.assertContains(response, 'Unfollow')
@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.caching import bump_tags, get_or_set_locked, versioned_key
+from posts.models import Post
+from yatube.caches import cache_from_url
+
+User = get_user_model()
+
+
+class CachingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bumped_tag_changes_key(self):
+        """Сброс тега меняет ключ всех записей с этим тегом."""
+        tags = ['index', 'author:leo']
+        key = versioned_key('feed', tags)
+        self.assertEqual(key, versioned_key('feed', tags))
+        bump_tags('author:leo')
+        self.assertNotEqual(key, versioned_key('feed', tags))
+
+    def test_locked_rebuild_runs_once(self):
+        """Пока запись строится, другие воркеры ее не пересчитывают."""
+        calls = []
+
+        def build():
+            calls.append(1)
+            return 42
+
+        self.assertEqual(get_or_set_locked('answer', build), 42)
+        self.assertEqual(get_or_set_locked('answer', build), 42)
+        self.assertEqual(len(calls), 1)
+        cache.delete('answer')
+        cache.add('lock:answer', 1)
+        with self.settings(CACHE_LOCK_TIMEOUT=0.1):
+            self.assertEqual(get_or_set_locked('answer', build), 42)
+
+    def test_feed_count_is_invalidated_by_new_post(self):
+        """Число постов ленты сбрасывается при публикации."""
+        author = User.objects.create_user(username='caching_author')
+        url = reverse('profile', kwargs={'username': author.username})
+        client = Client()
+        Post.objects.create(text='Первый', author=author)
+        self.assertEqual(client.get(url).context['page'].paginator.count, 1)
+        Post.objects.create(text='Второй', author=author)
+        self.assertEqual(client.get(url).context['page'].paginator.count, 2)
+
+    def test_feed_count_expires(self):
+        """Число постов ленты хранится в кэше ограниченное время."""
+        author = User.objects.create_user(username='expiring_author')
+        url = reverse('profile', kwargs={'username': author.username})
+        with mock.patch.object(cache, 'set', wraps=cache.set) as cache_set:
+            Client().get(url)
+        timeouts = {
+            call.args[2] for call in cache_set.call_args_list
+            if call.args[0].startswith('feed_count:')
+        }
+        self.assertEqual(timeouts, {settings.POSTS_COUNT_CACHE_TIMEOUT})
+
+    def test_cache_from_url(self):
+        """CACHE_URL выбирает общий бэкенд кэша."""
+        self.assertEqual(
+            cache_from_url('file:///tmp/yatube')['LOCATION'], '/tmp/yatube'
+        )
+        self.assertEqual(
+            cache_from_url('db://')['BACKEND'],
+            'django.core.cache.backends.db.DatabaseCache'
+        )
+        with self.assertRaises(ValueError):
+            cache_from_url('memcached://localhost')
@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+# Without the page cache every request renders the page and its cards
+@override_settings(POSTS_PAGE_CACHE_TIMEOUT=0)
+class CardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='card_author')
+        cls.post = Post.objects.create(text='Карточка', author=cls.author)
+        cls.profile_url = reverse(
+            'profile', kwargs={'username': cls.author.username}
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(CardCacheTests.author)
+
+    def test_card_is_rendered_once_per_version(self):
+        """Повторный показ ленты берет карточку из кэша."""
+        self.guest_client.get(self.profile_url)
+        key = f'post_card:{CardCacheTests.post.id}:1:short'
+        self.assertIn('Карточка', cache.get(key))
+        cache.set(key, 'из кэша')
+        self.assertContains(self.guest_client.get(self.profile_url), 'из кэша')
+
+    def test_edit_and_comment_bump_version(self):
+        """Правка и комментарий выпускают новую версию карточки."""
+        self.guest_client.get(self.profile_url)
+        post = Post.objects.get(pk=CardCacheTests.post.pk)
+        post.text = 'Новый текст'
+        post.save()
+        self.assertContains(
+            self.guest_client.get(self.profile_url), 'Новый текст'
+        )
+        Comment.objects.create(
+            post=post, author=CardCacheTests.author, text='Комментарий'
+        )
+        self.assertContains(
+            self.guest_client.get(self.profile_url), 'Comments:\n          1'
+        )
+
+    def test_edit_link_only_for_author(self):
+        """Ссылку на правку видит только автор, кэш ее не путает."""
+        edit_url = reverse('post_edit', kwargs={
+            'username': CardCacheTests.author.username,
+            'post_id': CardCacheTests.post.id
+        })
+        self.assertNotContains(
+            self.guest_client.get(self.profile_url), edit_url
+        )
+        self.assertContains(
+            self.author_client.get(self.profile_url), edit_url
+        )
+        self.assertNotContains(
+            self.guest_client.get(self.profile_url), edit_url
+        )
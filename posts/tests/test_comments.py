@@ -0,0 +1,88 @@
+import base64
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Comment, Post
+
+from .utils import QueryBudgetMixin
+
+User = get_user_model()
+
+
+@override_settings(POSTS_COMMENTS_PER_PAGE=5, POSTS_PAGE_CACHE_TIMEOUT=0)
+class CommentPaginationTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='comments_author')
+        cls.post = Post.objects.create(text='Текст', author=cls.author)
+        for number in range(12):
+            reader = User.objects.create_user(username=f'reader_{number}')
+            Comment.objects.create(
+                post=cls.post, author=reader, text=f'Комментарий {number}'
+            )
+        cls.post_url = reverse('post', kwargs={
+            'username': cls.author.username, 'post_id': cls.post.id
+        })
+        cls.comments_url = reverse('post_comments', kwargs={
+            'username': cls.author.username, 'post_id': cls.post.id
+        })
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_post_page_shows_first_chunk_of_comments(self):
+        """Страница поста показывает только первые комментарии, число
+        запросов не зависит от числа комментариев."""
+        response = self.assertWithinQueryBudget(
+            self.guest_client, CommentPaginationTests.post_url
+        )
+        comments = response.context['comment_page']
+        self.assertEqual(
+            [comment.text for comment in comments],
+            [f'Комментарий {number}' for number in range(11, 6, -1)]
+        )
+        self.assertTrue(comments.has_next())
+
+    def test_fragment_continues_after_cursor(self):
+        """Фрагмент с курсором возвращает следующие комментарии."""
+        first = self.guest_client.get(
+            CommentPaginationTests.post_url
+        ).context['comment_page']
+        url = CommentPaginationTests.comments_url
+        response = self.assertWithinQueryBudget(
+            self.guest_client, f'{url}?cursor={first.next_cursor}'
+        )
+        self.assertTemplateUsed(response, 'posts/includes/comment_list.html')
+        self.assertEqual(
+            [comment.text for comment in response.context['comment_page']],
+            [f'Комментарий {number}' for number in range(6, 1, -1)]
+        )
+
+    def test_fragment_with_cursor_of_wrong_types(self):
+        """Курсор с чужими типами значений даёт первые комментарии."""
+        cursor = base64.urlsafe_b64encode(
+            json.dumps(['next', ['x'], 'abc']).encode()
+        ).decode()
+        response = self.guest_client.get(
+            CommentPaginationTests.comments_url, {'cursor': cursor}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [comment.text for comment in response.context['comment_page']],
+            [f'Комментарий {number}' for number in range(11, 6, -1)]
+        )
+
+    def test_json_chunks_link_to_the_next_one(self):
+        """JSON-ответ содержит комментарии и ссылку на следующую порцию."""
+        url = f'{CommentPaginationTests.comments_url}?format=json'
+        texts = []
+        while url:
+            data = self.guest_client.get(url).json()
+            texts += [comment['text'] for comment in data['comments']]
+            url = data['next']
+        self.assertEqual(
+            texts, [f'Комментарий {number}' for number in range(11, -1, -1)]
+        )
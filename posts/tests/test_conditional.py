@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(POSTS_PAGE_CACHE_TIMEOUT=0)
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Заголовки', slug='headers', description='Описание'
+        )
+        cls.author = User.objects.create_user(username='headers_author')
+        cls.reader = User.objects.create_user(username='headers_reader')
+        cls.post = Post.objects.create(
+            text='Текст', author=cls.author, group=cls.group
+        )
+        cls.urls = (
+            reverse('index'),
+            reverse('group', kwargs={'slug': cls.group.slug}),
+            reverse('profile', kwargs={'username': cls.author.username}),
+            reverse('post', kwargs={
+                'username': cls.author.username, 'post_id': cls.post.id
+            }),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ConditionalGetTests.reader)
+
+    def test_repeated_anonymous_request_is_not_modified(self):
+        """Повторный анонимный запрос получает 304 за один запрос к БД."""
+        for url in ConditionalGetTests.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertIn('public', response['Cache-Control'])
+                self.assertIn('s-maxage', response['Cache-Control'])
+                self.assertIn('Last-Modified', response)
+                with self.assertNumQueries(1):
+                    response = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag']
+                    )
+                self.assertEqual(response.status_code, 304)
+
+    def test_changes_make_new_validators(self):
+        """Правка, комментарий и подписка меняют ETag страниц."""
+        etags = [
+            self.guest_client.get(url)['ETag']
+            for url in ConditionalGetTests.urls
+        ]
+        post = Post.objects.get(pk=ConditionalGetTests.post.pk)
+        post.text = 'Новый текст'
+        post.save()
+        Comment.objects.create(
+            post=post, author=ConditionalGetTests.reader, text='Комментарий'
+        )
+        Follow.objects.create(
+            user=ConditionalGetTests.reader, author=ConditionalGetTests.author
+        )
+        for url, etag in zip(ConditionalGetTests.urls, etags):
+            with self.subTest(url=url):
+                response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_authenticated_pages_are_private(self):
+        """Страницы пользователя не кэшируются общими кэшами."""
+        response = self.authorized_client.get(reverse('index'))
+        self.assertNotIn('ETag', response)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
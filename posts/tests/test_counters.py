@@ -0,0 +1,84 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import AuthorStats, Comment, Follow, Post
+
+User = get_user_model()
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='counter_author')
+        cls.reader = User.objects.create_user(username='counter_reader')
+        cls.post = Post.objects.create(text='Текст', author=cls.author)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(CountersTests.reader)
+
+    def test_comment_counter_follows_comments(self):
+        """Счетчик комментариев меняется при добавлении и удалении."""
+        self.authorized_client.post(
+            reverse('add_comment', kwargs={
+                'username': CountersTests.author.username,
+                'post_id': CountersTests.post.id
+            }),
+            data={'text': 'Комментарий'}
+        )
+        CountersTests.post.refresh_from_db()
+        self.assertEqual(CountersTests.post.comment_count, 1)
+        Comment.objects.get(post=CountersTests.post).delete()
+        CountersTests.post.refresh_from_db()
+        self.assertEqual(CountersTests.post.comment_count, 0)
+
+    def test_stale_instance_keeps_counters(self):
+        """Сохранение старого экземпляра поста не откатывает счетчик
+        комментариев и версию."""
+        stale = Post.objects.get(pk=CountersTests.post.pk)
+        Comment.objects.create(
+            post=CountersTests.post, author=CountersTests.reader, text='Да'
+        )
+        fresh = Post.objects.get(pk=CountersTests.post.pk)
+        stale.text = 'Новый текст'
+        stale.save()
+        stale.refresh_from_db()
+        self.assertEqual(stale.text, 'Новый текст')
+        self.assertEqual(stale.comment_count, fresh.comment_count)
+        self.assertGreater(stale.version, fresh.version)
+
+    def test_author_stats_follow_posts_and_follows(self):
+        """Статистика автора учитывает посты и подписки."""
+        self.authorized_client.get(reverse(
+            'profile_follow', kwargs={'username': CountersTests.author}
+        ))
+        author_stats = AuthorStats.objects.get(user=CountersTests.author)
+        reader_stats = AuthorStats.objects.get(user=CountersTests.reader)
+        self.assertEqual(
+            (author_stats.followers, author_stats.posts), (1, 1)
+        )
+        self.assertEqual(reader_stats.following, 1)
+        response = self.authorized_client.get(reverse(
+            'profile', kwargs={'username': CountersTests.author}
+        ))
+        self.assertEqual(response.context['stats'], author_stats)
+
+    def test_rebuild_counters_fixes_stale_values(self):
+        """Команда rebuild_counters находит и чинит устаревшие счетчики."""
+        Follow.objects.create(
+            user=CountersTests.reader, author=CountersTests.author
+        )
+        Post.objects.filter(pk=CountersTests.post.pk).update(comment_count=5)
+        AuthorStats.objects.filter(user=CountersTests.author).update(posts=7)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_counters', check=True, stdout=StringIO())
+        call_command('rebuild_counters', stdout=StringIO())
+        call_command('rebuild_counters', check=True, stdout=StringIO())
+        author_stats = AuthorStats.objects.get(user=CountersTests.author)
+        self.assertEqual(
+            (author_stats.followers, author_stats.posts), (1, 1)
+        )
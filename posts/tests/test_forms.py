@@ -61,7 +61,6 @@ class PostCreateFormTests(TestCase):
             'image': uploaded
         }
         form_text = form_data['text']
-        form_image = form_data['image']
         response = self.authorized_client.post(
             reverse('new_post'),
             data=form_data,
@@ -75,7 +74,10 @@ class PostCreateFormTests(TestCase):
         self.assertEqual(Post.objects.count(), post_count + 1)
         self.assertEqual(new_post.group_id, PostCreateFormTests.group.id)
         self.assertEqual(new_post.text, form_text)
-        self.assertEqual(new_post.image, f'posts/{form_image}')
+        # Stored re-encoded, under the hash of its content
+        self.assertRegex(
+            new_post.image.name, r'^posts/\w{2}/\w{2}/\w{64}\.jpg$'
+        )
 
     def test_cant_create_form_with_no_text(self):
         """Отсутствие текста в поле text не создает запись в Post."""
@@ -0,0 +1,168 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from posts import images, jobs
+from posts.forms import PostForm
+from posts.models import Job, Post
+from yatube.storage import media_storage
+
+User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_upload(size, orientation=None, name='photo.jpg', color='red'):
+    image = Image.new('RGB', size, color)
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    exif[0x010F] = 'Phone'
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', exif=exif)
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/jpeg')
+
+
+@override_settings(
+    POSTS_IMAGE_MASTER_SIZE=400, POSTS_IMAGE_WIDTHS=(100, 200, 800),
+    POSTS_IMAGE_FORMATS=('webp', 'jpeg')
+)
+class ImageProcessingTests(SimpleTestCase):
+    def test_master_is_bounded_upright_and_clean(self):
+        """Мастер уменьшен, повернут по EXIF и сохранен без метаданных."""
+        # Orientation 6: the camera was turned, the picture is 900x600
+        image, master = images.make_master(
+            make_upload((900, 600), orientation=6)
+        )
+        self.assertEqual(image.size, (267, 400))
+        saved = Image.open(master)
+        self.assertEqual(saved.size, (267, 400))
+        self.assertEqual(len(saved.getexif()), 0)
+
+    @override_settings(POSTS_IMAGE_FORMATS=('avif', 'webp', 'jpeg'))
+    def test_unsupported_format_is_skipped(self):
+        """Форматы, которые Pillow не пишет, пропускаются без
+        предупреждений."""
+        with mock.patch.object(images, 'WRITABLE', {'webp', 'jpeg'}):
+            self.assertEqual(images.formats(), ['webp', 'jpeg'])
+
+    @override_settings(POSTS_IMAGE_MAX_PIXELS=10_000)
+    def test_form_rejects_too_many_pixels(self):
+        """Форма отклоняет картинку с лишними пикселями до декодирования."""
+        form = PostForm(
+            data={'text': 'Текст'}, files={'image': make_upload((200, 100))}
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn('image', form.errors)
+
+    @override_settings(POSTS_IMAGE_MAX_UPLOAD_SIZE=100)
+    def test_form_rejects_large_file(self):
+        """Форма отклоняет слишком большой файл."""
+        form = PostForm(
+            data={'text': 'Текст'}, files={'image': make_upload((50, 50))}
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn('image', form.errors)
+
+
+@override_settings(
+    MEDIA_STORAGE='local', MEDIA_ROOT=MEDIA_ROOT, JOBS_ALWAYS_EAGER=False,
+    POSTS_PAGE_CACHE_TIMEOUT=0, POSTS_IMAGE_MASTER_SIZE=400,
+    POSTS_IMAGE_WIDTHS=(100,), POSTS_IMAGE_FORMATS=('webp', 'jpeg')
+)
+class ImageUploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='image_author')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(ImageUploadTests.author)
+
+    def create_post(self, text, color='red'):
+        self.client.post(reverse('new_post'), {
+            'text': text, 'image': make_upload((300, 200), color=color)
+        })
+        return Post.objects.get(text=text)
+
+    def edit_post(self, post, color):
+        self.client.post(
+            reverse('post_edit', args=[post.author.username, post.id]),
+            {'text': post.text, 'image': make_upload((300, 200), color=color)}
+        )
+        post.refresh_from_db()
+        return post
+
+    def files(self, post):
+        return [post.image.name] + [
+            rendition['name'] for rendition in post.renditions
+        ]
+
+    def test_renditions_are_built_by_job(self):
+        """Рендишены строит задача очереди, до этого карточка
+        показывает мастер."""
+        post = self.create_post('Новая картинка')
+        self.assertEqual((post.image_width, post.image_height), (300, 200))
+        self.assertEqual(post.renditions, [])
+        self.assertTrue(Job.objects.filter(
+            name='posts.images.build_renditions'
+        ).exists())
+        response = self.client.get(reverse('post', args=[
+            post.author.username, post.id
+        ]))
+        self.assertContains(response, post.image.url)
+        self.assertNotContains(response, '<picture')
+        images.build_renditions(post.pk)
+        post.refresh_from_db()
+        self.assertEqual(
+            [(rendition['format'], rendition['width'])
+             for rendition in post.renditions],
+            [('webp', 100), ('jpeg', 100), ('webp', 300), ('jpeg', 300)]
+        )
+        # The largest JPEG is the master itself
+        self.assertEqual(post.renditions[-1]['name'], post.image.name)
+        with media_storage.open(post.renditions[0]['name']) as rendition:
+            self.assertEqual(Image.open(rendition).format, 'WEBP')
+        for name in self.files(post):
+            self.assertTrue(media_storage.exists(name))
+
+    def test_edit_deletes_previous_files(self):
+        """Замена картинки удаляет прежний мастер и его рендишены."""
+        post = self.create_post('Старая картинка', color='blue')
+        post.thumbnail_url = '/thumbs/old.jpg'
+        post.save()
+        jobs.run_pending()
+        post.refresh_from_db()
+        previous = self.files(post)
+        post = self.edit_post(post, color='green')
+        self.assertEqual(post.thumbnail_url, '')
+        jobs.run_pending()
+        post.refresh_from_db()
+        for name in previous:
+            self.assertFalse(media_storage.exists(name))
+        for name in self.files(post):
+            self.assertTrue(media_storage.exists(name))
+
+    def test_shared_master_is_kept(self):
+        """Мастер, который показывает другой пост, не удаляется."""
+        post = self.create_post('Первая копия', color='yellow')
+        other = self.create_post('Вторая копия', color='yellow')
+        self.assertEqual(post.image.name, other.image.name)
+        jobs.run_pending()
+        self.edit_post(post, color='purple')
+        jobs.run_pending()
+        other.refresh_from_db()
+        self.assertEqual(len(other.renditions), 4)
+        for name in self.files(other):
+            self.assertTrue(media_storage.exists(name))
@@ -0,0 +1,25 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from posts.models import Follow
+
+User = get_user_model()
+
+
+class FeedIndexesTests(TestCase):
+    def test_feed_queries_use_their_indexes(self):
+        """Запросы лент используют добавленные для них индексы."""
+        out = StringIO()
+        call_command('explain_feeds', fail=True, stdout=out)
+        self.assertNotIn('MISS', out.getvalue())
+
+    def test_follow_is_unique(self):
+        """Повторная подписка на автора невозможна."""
+        user = User.objects.create_user(username='index_user')
+        author = User.objects.create_user(username='index_author')
+        Follow.objects.create(user=user, author=author)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Follow.objects.create(user=user, author=author)
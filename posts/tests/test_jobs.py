@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from posts import jobs, search
+from posts.models import Follow, Job, Post, TimelineEntry
+
+User = get_user_model()
+
+
+@jobs.job()
+def failing():
+    raise ValueError('Сбой')
+
+
+@override_settings(
+    JOBS_ALWAYS_EAGER=False, JOBS_MAX_ATTEMPTS=2, POSTS_PAGE_CACHE_TIMEOUT=0
+)
+class JobQueueTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='jobs_reader')
+        cls.author = User.objects.create_user(username='jobs_author')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(JobQueueTests.author)
+
+    def test_side_effects_run_by_worker(self):
+        """Рассылка в ленты и индексация выполняются воркером."""
+        Follow.objects.create(
+            user=JobQueueTests.reader, author=JobQueueTests.author
+        )
+        self.authorized_client.post(reverse('new_post'), {'text': 'Очередь'})
+        post = Post.objects.get(text='Очередь')
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertFalse(search.search('Очередь').exists())
+        queued = Job.objects.count()
+        self.assertEqual(jobs.run_pending(), queued)
+        self.assertFalse(Job.objects.exists())
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=JobQueueTests.reader, post=post
+        ).exists())
+        self.assertEqual(list(search.search('Очередь')), [post])
+
+    def test_same_key_is_queued_once_and_batched(self):
+        """Повторные задачи с одним ключом не дублируются, похожие
+        выполняются одной пачкой."""
+        posts = [
+            Post.objects.create(text=f'Пакет {number}', author=self.author)
+            for number in range(3)
+        ]
+        Job.objects.all().delete()
+        for post in posts + posts:
+            jobs.enqueue(
+                search.reindex, {'post_id': post.id},
+                key=f'reindex:{post.id}'
+            )
+        self.assertEqual(Job.objects.count(), 3)
+        self.assertEqual(jobs.run_next(), 3)
+        self.assertEqual(search.search('Пакет').count(), 3)
+
+    def test_failed_job_is_retried(self):
+        """Упавшая задача повторяется позже, после лимита попыток
+        помечается как failed."""
+        job = jobs.enqueue(failing)
+        with self.assertLogs('posts.jobs', 'ERROR'):
+            jobs.run_next()
+        job.refresh_from_db()
+        self.assertEqual(job.state, Job.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('Сбой', job.last_error)
+        self.assertEqual(jobs.run_next(), 0)
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs('posts.jobs', 'ERROR'):
+            jobs.run_next()
+        job.refresh_from_db()
+        self.assertEqual(job.state, Job.FAILED)
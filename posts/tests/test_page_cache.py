@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Страницы', slug='pages', description='Описание'
+        )
+        cls.author = User.objects.create_user(username='page_author')
+        cls.reader = User.objects.create_user(username='page_reader')
+        cls.post = Post.objects.create(
+            text='Текст', author=cls.author, group=cls.group
+        )
+        cls.post_url = reverse('post', kwargs={
+            'username': cls.author.username, 'post_id': cls.post.id
+        })
+        cls.profile_url = reverse(
+            'profile', kwargs={'username': cls.author.username}
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(PageCacheTests.reader)
+
+    def test_anonymous_pages_are_served_from_cache(self):
+        """Повторный анонимный запрос не обращается к БД."""
+        urls = (
+            reverse('index'),
+            reverse('group', kwargs={'slug': PageCacheTests.group.slug}),
+            PageCacheTests.profile_url,
+            PageCacheTests.post_url,
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.guest_client.get(url)
+                with self.assertNumQueries(0):
+                    second = self.guest_client.get(url)
+                self.assertEqual(second.content, first.content)
+                with self.assertNumQueries(0):
+                    response = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=first['ETag']
+                    )
+                self.assertEqual(response.status_code, 304)
+
+    def test_unknown_parameters_share_the_page(self):
+        """Посторонние параметры запроса не создают новых записей кэша."""
+        url = reverse('index')
+        self.guest_client.get(url, {'page': 1})
+        with self.assertNumQueries(0):
+            self.guest_client.get(url, {'page': 1, 'utm_source': 'mail'})
+            self.guest_client.get(url, {'utm_source': 'news', 'page': 1})
+
+    def test_writes_purge_their_pages(self):
+        """Новый пост, комментарий и подписка сразу видны на страницах."""
+        self.guest_client.get(reverse('index'))
+        self.guest_client.get(PageCacheTests.post_url)
+        self.guest_client.get(PageCacheTests.profile_url)
+        Post.objects.create(text='Свежий пост', author=PageCacheTests.author)
+        Comment.objects.create(
+            post=PageCacheTests.post, author=PageCacheTests.reader,
+            text='Свежий комментарий'
+        )
+        Follow.objects.create(
+            user=PageCacheTests.reader, author=PageCacheTests.author
+        )
+        self.assertContains(
+            self.guest_client.get(reverse('index')), 'Свежий пост'
+        )
+        self.assertContains(
+            self.guest_client.get(PageCacheTests.post_url),
+            'Свежий комментарий'
+        )
+        response = self.guest_client.get(PageCacheTests.profile_url)
+        self.assertEqual(response.context['stats'].followers, 1)
+
+    def test_authenticated_pages_are_not_cached(self):
+        """Страницы пользователя собираются заново при каждом запросе."""
+        self.authorized_client.get(reverse('index'))
+        response = self.authorized_client.get(reverse('index'))
+        self.assertIsNotNone(response.context)
@@ -0,0 +1,77 @@
+import base64
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Post
+from posts.paginator import CursorPage, CursorPaginator
+
+User = get_user_model()
+
+
+@override_settings(POSTS_PAGINATION='cursor')
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='cursor_author')
+        Post.objects.bulk_create(
+            [Post(text=f'Текст {post}', author=cls.user) for post in range(13)]
+        )
+        cls.profile_url = reverse(
+            'profile', kwargs={'username': cls.user.username}
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_cursor_pages_walk_forward_and_back(self):
+        """Курсоры ведут на следующую и обратно на предыдущую страницу."""
+        first = self.guest_client.get(self.profile_url).context['page']
+        self.assertIsInstance(first, CursorPage)
+        self.assertEqual(len(first), 10)
+        self.assertFalse(first.has_previous())
+        second = self.guest_client.get(
+            self.profile_url, {'cursor': first.next_cursor}
+        ).context['page']
+        self.assertEqual(len(second), 3)
+        self.assertFalse(second.has_next())
+        back = self.guest_client.get(
+            self.profile_url, {'cursor': second.previous_cursor}
+        ).context['page']
+        self.assertEqual(
+            [post.id for post in back], [post.id for post in first]
+        )
+
+    def test_cursor_page_runs_no_count_query(self):
+        """Страница курсорной пагинации - один запрос без COUNT."""
+        posts = Post.objects.filter(author=CursorPaginatorTests.user)
+        paginator = CursorPaginator(posts, 10)
+        first = paginator.get_page()
+        with self.assertNumQueries(1):
+            paginator.get_page(first.next_cursor)
+
+    def test_broken_cursor_returns_first_page(self):
+        """Испорченный курсор открывает первую страницу."""
+        response = self.guest_client.get(
+            self.profile_url, {'cursor': 'broken'}
+        )
+        self.assertEqual(len(response.context['page']), 10)
+
+    def test_cursor_of_wrong_types_returns_first_page(self):
+        """Курсор с чужими типами значений открывает первую страницу."""
+        cursors = [
+            [['x'], 'abc'], ['x', 'abc'], [{'dt': 1}, 1],
+            [{'dt': 'вчера'}, 1], [{'dt': '2022-01-01', 'x': 1}, 1],
+            [None, 1], [True, 1], [{'dt': '2022-01-01T00:00:00'}],
+        ]
+        for values in cursors:
+            cursor = base64.urlsafe_b64encode(
+                json.dumps(['next'] + values).encode()
+            ).decode()
+            with self.subTest(values=values):
+                for url in (reverse('index'), self.profile_url):
+                    response = self.guest_client.get(url, {'cursor': cursor})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(len(response.context['page']), 10)
@@ -0,0 +1,74 @@
+import threading
+
+from django.test import SimpleTestCase
+from yatube.db.pool import ConnectionPool, PoolTimeout, connection_checked_out
+
+
+class FakeConnection:
+    def __init__(self):
+        self.healthy = True
+        self.closed = False
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def make_pool(self, **kwargs):
+        return ConnectionPool(
+            connect=FakeConnection,
+            check=lambda connection: connection.healthy,
+            close=lambda connection: setattr(connection, 'closed', True),
+            **kwargs
+        )
+
+    def test_connections_are_reused(self):
+        """Возвращенное соединение выдается следующему запросу."""
+        pool = self.make_pool(max_size=2)
+        connection = pool.checkout()
+        pool.checkin(connection)
+        self.assertIs(pool.checkout(), connection)
+        self.assertEqual(pool.stats['created'], 1)
+        self.assertEqual(pool.stats['reused'], 1)
+
+    def test_size_is_limited(self):
+        """Сверх max_size соединения не открываются, запрос ждет свободное
+        или получает PoolTimeout."""
+        pool = self.make_pool(max_size=1, timeout=0.05)
+        connection = pool.checkout()
+        with self.assertRaises(PoolTimeout):
+            pool.checkout()
+        threading.Timer(0.01, pool.checkin, [connection]).start()
+        pool.timeout = 5
+        self.assertIs(pool.checkout(), connection)
+        self.assertEqual(pool.size, 1)
+
+    def test_broken_connection_is_replaced(self):
+        """Нерабочее соединение закрывается и заменяется новым."""
+        pool = self.make_pool(max_size=1, check_after=0)
+        connection = pool.checkout()
+        pool.checkin(connection)
+        connection.healthy = False
+        replacement = pool.checkout()
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.size, 1)
+
+    def test_discarded_connection_frees_slot(self):
+        """Сброшенное соединение освобождает место в пуле."""
+        pool = self.make_pool(max_size=1, timeout=0)
+        connection = pool.checkout()
+        pool.checkin(connection, discard=True)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.size, 0)
+        self.assertIsNot(pool.checkout(), connection)
+
+    def test_checkout_reports_wait(self):
+        """Каждая выдача соединения сообщает время ожидания."""
+        waits = []
+
+        def receiver(sender, wait, **kwargs):
+            waits.append(wait)
+
+        connection_checked_out.connect(receiver)
+        self.addCleanup(connection_checked_out.disconnect, receiver)
+        self.make_pool(max_size=1).checkout()
+        self.assertEqual(len(waits), 1)
+        self.assertGreaterEqual(waits[0], 0)
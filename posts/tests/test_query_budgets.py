@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts import metrics
+from posts.models import Comment, Follow, Group, Post
+
+from .utils import QueryBudgetMixin
+
+User = get_user_model()
+
+
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Бюджет', slug='budget', description='Описание'
+        )
+        cls.author = User.objects.create_user(username='budget_author')
+        cls.reader = User.objects.create_user(username='budget_reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for number in range(12):
+            post = Post.objects.create(
+                text=f'Пост {number}', author=cls.author, group=cls.group
+            )
+            Comment.objects.create(
+                post=post, author=cls.reader, text='Комментарий'
+            )
+        cls.post = post
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(QueryBudgetTests.reader)
+
+    def test_pages_stay_within_query_budget(self):
+        """Число запросов страниц не растет вместе с числом карточек."""
+        urls = (
+            reverse('index'),
+            reverse('group', kwargs={'slug': QueryBudgetTests.group.slug}),
+            reverse('profile', kwargs={
+                'username': QueryBudgetTests.author.username
+            }),
+            reverse('post', kwargs={
+                'username': QueryBudgetTests.author.username,
+                'post_id': QueryBudgetTests.post.id
+            }),
+        )
+        for url in urls:
+            for client in (self.guest_client, self.authorized_client):
+                with self.subTest(url=url):
+                    self.assertWithinQueryBudget(client, url)
+        self.assertWithinQueryBudget(
+            self.authorized_client, reverse('follow_index')
+        )
+
+    def test_server_timing_header_and_summary(self):
+        """Ответ содержит Server-Timing, а сводка учитывает запрос."""
+        metrics.summary.clear()
+        response = self.guest_client.get(reverse('index'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('tpl;dur=', response['Server-Timing'])
+        self.assertEqual(metrics.summary.report()['index']['requests'], 1)
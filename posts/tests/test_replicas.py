@@ -0,0 +1,73 @@
+from django.contrib.sessions.models import Session
+from django.core.cache.backends.db import DatabaseCache
+from django.db import router
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from posts.models import Post
+from yatube.replicas import PIN_COOKIE, ReplicaMiddleware
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.routed = []
+
+    def view(self, request):
+        self.routed.append(router.db_for_read(Post))
+        if request.method == 'POST':
+            router.db_for_write(Post)
+            self.routed.append(router.db_for_read(Post))
+        return HttpResponse()
+
+    def test_safe_reads_go_to_replica(self):
+        """Чтение в GET-запросе идет на реплику, вне запроса - на основную
+        базу."""
+        ReplicaMiddleware(self.view)(self.factory.get('/'))
+        self.assertEqual(self.routed, ['replica'])
+        self.assertEqual(router.db_for_read(Post), 'default')
+
+    def test_writer_reads_own_writes(self):
+        """После записи чтение идет на основную базу до конца запроса и
+        в следующих запросах с меткой."""
+        response = ReplicaMiddleware(self.view)(self.factory.post('/'))
+        self.assertEqual(self.routed, ['default', 'default'])
+        self.assertIn(PIN_COOKIE, response.cookies)
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = response.cookies[PIN_COOKIE].value
+        ReplicaMiddleware(self.view)(request)
+        self.assertEqual(self.routed[-1], 'default')
+
+    def test_write_in_get_request_pins_client(self):
+        """Запись в GET-запросе тоже ставит метку."""
+        def view(request):
+            router.db_for_write(Post)
+            self.routed.append(router.db_for_read(Post))
+            return HttpResponse()
+        response = ReplicaMiddleware(view)(self.factory.get('/'))
+        self.assertEqual(self.routed, ['default'])
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+    def test_cache_and_sessions_stay_on_primary(self):
+        """Таблица кэша и сессии не идут на реплику и не ставят метку."""
+        cache_model = DatabaseCache('cache_table', {}).cache_model_class
+
+        def view(request):
+            for model in (cache_model, Session):
+                self.routed.append(router.db_for_write(model))
+                self.routed.append(router.db_for_read(model))
+            return HttpResponse()
+        response = ReplicaMiddleware(view)(self.factory.get('/'))
+        self.assertEqual(self.routed, ['default'] * 4)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_public_response_is_not_pinned(self):
+        """Ответ для общих кэшей не получает метку."""
+        def view(request):
+            router.db_for_write(Post)
+            response = HttpResponse()
+            patch_cache_control(response, public=True, s_maxage=60)
+            return response
+        response = ReplicaMiddleware(view)(self.factory.get('/'))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
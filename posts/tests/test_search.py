@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Поиск', slug='search_group', description='Описание'
+        )
+        cls.author = User.objects.create_user(username='search_author')
+        cls.other = User.objects.create_user(username='search_other')
+        cls.best = Post.objects.create(
+            text='кофе кофе кофе утром', author=cls.author, group=cls.group
+        )
+        cls.weak = Post.objects.create(
+            text='утром чай, а кофе вечером, и еще много других слов',
+            author=cls.other
+        )
+        Post.objects.create(text='только чай', author=cls.author)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def found(self, **params):
+        response = self.guest_client.get(reverse('search'), params)
+        return [post.id for post in response.context['page']]
+
+    def test_results_are_ranked(self):
+        """Поиск находит посты со всеми словами, лучшие - первыми."""
+        self.assertEqual(
+            self.found(q='кофе утром'),
+            [SearchTests.best.id, SearchTests.weak.id]
+        )
+
+    @override_settings(POSTS_PER_PAGE=1)
+    def test_cursor_walks_ranked_results(self):
+        """Курсор ведет по результатам в порядке ранга."""
+        first = self.guest_client.get(
+            reverse('search'), {'q': 'кофе'}
+        ).context['page']
+        second = self.guest_client.get(
+            reverse('search'), {'q': 'кофе', 'cursor': first.next_cursor}
+        ).context['page']
+        self.assertEqual(
+            [post.id for post in list(first) + list(second)],
+            [SearchTests.best.id, SearchTests.weak.id]
+        )
+        self.assertFalse(second.has_next())
+
+    def test_results_filtered_by_group_and_author(self):
+        """Результаты поиска фильтруются по группе и автору."""
+        self.assertEqual(
+            self.found(q='кофе', group=SearchTests.group.slug),
+            [SearchTests.best.id]
+        )
+        self.assertEqual(
+            self.found(q='кофе', author=SearchTests.other.username),
+            [SearchTests.weak.id]
+        )
+
+    def test_index_follows_edit_and_delete(self):
+        """Индекс обновляется при изменении и удалении поста."""
+        weak = Post.objects.get(pk=SearchTests.weak.pk)
+        weak.text = 'только вечером'
+        weak.save()
+        self.assertEqual(self.found(q='кофе'), [SearchTests.best.id])
+        Post.objects.get(pk=SearchTests.best.pk).delete()
+        self.assertEqual(self.found(q='кофе'), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        """Служебные символы в запросе не ломают поиск."""
+        response = self.guest_client.get(
+            reverse('search'), {'q': 'кофе" OR NEAR(*'}
+        )
+        self.assertEqual(response.status_code, 200)
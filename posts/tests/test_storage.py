@@ -0,0 +1,59 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, override_settings
+from yatube.storage import media_storage
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_STORAGE='local', MEDIA_ROOT=MEDIA_ROOT)
+class ContentAddressedStorageTests(SimpleTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def stored_files(self):
+        return [
+            os.path.join(root, name)
+            for root, _, names in os.walk(MEDIA_ROOT) for name in names
+        ]
+
+    def test_name_is_hash_of_content(self):
+        """Имя файла - хэш содержимого в шардированном каталоге."""
+        name = media_storage.save('posts/photo.JPG', ContentFile(b'photo'))
+        digest = hashlib.sha256(b'photo').hexdigest()
+        self.assertEqual(
+            name, f'posts/{digest[:2]}/{digest[2:4]}/{digest}.jpg'
+        )
+        self.assertTrue(media_storage.exists(name))
+
+    def test_duplicate_is_not_written_again(self):
+        """Повторная загрузка того же содержимого не создает файл."""
+        first = media_storage.save('posts/a.png', ContentFile(b'same'))
+        files = self.stored_files()
+        modified = os.path.getmtime(media_storage.path(first))
+        second = media_storage.save('posts/b.png', ContentFile(b'same'))
+        self.assertEqual(first, second)
+        self.assertEqual(self.stored_files(), files)
+        self.assertEqual(os.path.getmtime(media_storage.path(first)), modified)
+        other = media_storage.save('posts/a.png', ContentFile(b'other'))
+        self.assertNotEqual(other, first)
+
+    def test_concurrent_save_of_same_content(self):
+        """Файл, записанный параллельно после проверки, считается
+        сохраненным, а не получает другое имя."""
+        first = media_storage.save('posts/c.png', ContentFile(b'race'))
+        files = self.stored_files()
+        # The other save checked the name before the file was written
+        with mock.patch.object(
+            media_storage._wrapped, 'exists', side_effect=[False, True]
+        ):
+            second = media_storage.save('posts/d.png', ContentFile(b'race'))
+        self.assertEqual(second, first)
+        self.assertEqual(self.stored_files(), files)
@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(POSTS_STREAM_PAGES=True, POSTS_PAGE_CACHE_TIMEOUT=0)
+class StreamingPageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='stream_author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='stream-group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            text='Первый пост', author=cls.author, group=cls.group
+        )
+        Post.objects.create(text='Второй пост', author=cls.author)
+        Comment.objects.bulk_create([
+            Comment(post=cls.post, author=cls.author, text=f'Ответ {number}')
+            for number in range(3)
+        ])
+        cls.urls = [
+            reverse('index'),
+            reverse('profile', args=[cls.author.username]),
+            reverse('post', args=[cls.author.username, cls.post.id]),
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(StreamingPageTests.author)
+
+    def test_streamed_page_equals_rendered_page(self):
+        """Страница в потоке совпадает с обычной."""
+        for url in StreamingPageTests.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(response.streaming)
+                streamed = b''.join(response.streaming_content)
+                with self.settings(POSTS_STREAM_PAGES=False):
+                    rendered = self.client.get(url).content
+                # Only the CSRF token differs between the two renders
+                self.assertEqual(
+                    streamed.count(b'<div class="card'),
+                    rendered.count(b'<div class="card')
+                )
+                self.assertEqual(len(streamed), len(rendered))
+
+    def test_layout_comes_first(self):
+        """Первая часть потока - разметка страницы без карточек."""
+        response = self.client.get(StreamingPageTests.urls[2])
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+        self.assertIn('<nav', chunks[0])
+        self.assertNotIn('Ответ', chunks[0])
+        self.assertIn('Ответ 0', ''.join(chunks))
+        self.assertGreater(len(chunks), 3)
+
+    @override_settings(POSTS_PAGE_CACHE_TIMEOUT=60)
+    def test_cached_page_is_not_streamed(self):
+        """Страница для анонимов, которая попадет в кэш, не идет
+        потоком."""
+        guest = Client()
+        response = guest.get(reverse('index'))
+        self.assertFalse(response.streaming)
+        self.assertContains(response, 'Первый пост')
+        with self.assertNumQueries(0):
+            self.assertContains(guest.get(reverse('index')), 'Второй пост')
+        self.assertTrue(self.client.get(reverse('index')).streaming)
+
+    def test_streamed_page_timing_is_partial(self):
+        """Server-Timing потока помечен как неполный, бюджет запросов
+        не проверяется."""
+        with override_settings(QUERY_BUDGETS={'index': 0}):
+            with self.assertNoLogs('posts.middleware', 'WARNING'):
+                response = self.client.get(reverse('index'))
+        self.assertTrue(response.streaming)
+        self.assertIn('stream;desc=', response['Server-Timing'])
@@ -0,0 +1,123 @@
+from concurrent.futures.process import BrokenProcessPool
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from posts import thumbnails
+from posts.models import Post
+
+User = get_user_model()
+
+
+# Thumbnails are built inline: no process pool on the real database
+@override_settings(POSTS_THUMBNAIL_WORKERS=0)
+class CardThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='thumb_author')
+        cls.post = Post.objects.create(
+            text='С картинкой', author=cls.author, image='posts/photo.jpg'
+        )
+        cls.profile_url = reverse(
+            'profile', kwargs={'username': cls.author.username}
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_card_shows_original_until_thumbnail_is_ready(self):
+        """Пока миниатюра не готова, карточка показывает оригинал."""
+        response = self.guest_client.get(self.profile_url)
+        self.assertContains(response, 'posts/photo.jpg')
+
+    def test_card_shows_precomputed_thumbnail(self):
+        """Готовая миниатюра берется из поля поста, без ресайза."""
+        Post.objects.filter(pk=CardThumbnailTests.post.pk).update(
+            thumbnail_url='/thumbs/card.jpg', version=2
+        )
+        response = self.guest_client.get(self.profile_url)
+        self.assertContains(response, 'src="/thumbs/card.jpg"')
+
+    def test_warm_skips_processed_uploads(self):
+        """Команда строит миниатюры только старых картинок без мастера."""
+        Post.objects.create(
+            text='Мастер', author=CardThumbnailTests.author,
+            image='posts/master.jpg', image_width=300, image_height=200
+        )
+        with mock.patch.object(thumbnails, 'build') as build:
+            call_command('warm_thumbnails', stdout=StringIO())
+        build.assert_called_once_with(CardThumbnailTests.post.pk)
+
+
+class ThumbnailLookupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        thumbnails.hot_urls.clear()
+
+    def test_page_thumbnails_resolved_in_one_batch(self):
+        """Известные миниатюры страницы находятся без запросов к БД,
+        неизвестные не строятся и не ставятся в очередь при чтении."""
+        posts = [
+            Post(pk=1, image='posts/known.jpg'),
+            Post(pk=2, image='posts/new.jpg'),
+        ]
+        thumbnails.remember('posts/known.jpg', '/thumbs/known.jpg')
+        thumbnails.hot_urls.clear()
+        with self.assertNumQueries(0), mock.patch.object(
+            thumbnails, 'schedule'
+        ) as schedule:
+            thumbnails.resolve(posts)
+        schedule.assert_not_called()
+        self.assertEqual(posts[0].thumbnail_url, '/thumbs/known.jpg')
+        self.assertEqual(posts[1].thumbnail_url, '')
+        self.assertEqual(
+            thumbnails.hot_urls.get('posts/known.jpg'), '/thumbs/known.jpg'
+        )
+
+    def test_lru_evicts_least_recently_used(self):
+        """LRU вытесняет давно не использованные адреса."""
+        lru = thumbnails.LRUCache(2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual((lru.get('a'), lru.get('b')), (1, None))
+
+
+class BrokenPool:
+    def __init__(self):
+        self.shut_down = False
+
+    def submit(self, *args):
+        raise BrokenProcessPool('A worker died')
+
+    def shutdown(self, wait=True):
+        self.shut_down = True
+
+
+class WorkingPool(BrokenPool):
+    def submit(self, func, *args):
+        return (func, args)
+
+
+class ThumbnailPoolTests(SimpleTestCase):
+    def tearDown(self):
+        thumbnails._executor = None
+
+    def test_broken_pool_is_replaced(self):
+        """Пул с погибшим процессом заменяется новым, задача не теряется."""
+        broken = BrokenPool()
+        thumbnails._executor = broken
+        with mock.patch.object(
+            thumbnails, 'make_executor', return_value=WorkingPool()
+        ), self.assertLogs('posts.thumbnails', 'WARNING'):
+            task = thumbnails.submit(7)
+        self.assertEqual(task, (thumbnails.build, (7,)))
+        self.assertTrue(broken.shut_down)
+        self.assertIsInstance(thumbnails._executor, WorkingPool)
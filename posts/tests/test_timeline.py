@@ -0,0 +1,156 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='timeline_reader')
+        cls.author = User.objects.create_user(username='timeline_author')
+        cls.old_post = Post.objects.create(
+            text='Старый пост', author=cls.author
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(TimelineTests.reader)
+
+    def feed_ids(self):
+        response = self.authorized_client.get(reverse('follow_index'))
+        return [post.id for post in response.context['page']]
+
+    def test_follow_backfills_and_new_post_fans_out(self):
+        """Подписка переносит старые посты в ленту, новые попадают сразу."""
+        self.authorized_client.get(reverse(
+            'profile_follow', kwargs={'username': TimelineTests.author}
+        ))
+        new_post = Post.objects.create(
+            text='Новый пост', author=TimelineTests.author
+        )
+        self.assertEqual(
+            self.feed_ids(), [new_post.id, TimelineTests.old_post.id]
+        )
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=TimelineTests.reader).count(), 2
+        )
+
+    def test_unfollow_trims_timeline(self):
+        """Отписка убирает посты автора из ленты."""
+        Follow.objects.create(
+            user=TimelineTests.reader, author=TimelineTests.author
+        )
+        self.authorized_client.get(reverse(
+            'profile_unfollow', kwargs={'username': TimelineTests.author}
+        ))
+        self.assertEqual(self.feed_ids(), [])
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=TimelineTests.reader).exists()
+        )
+
+    @override_settings(POSTS_TIMELINE_FANOUT_LIMIT=0)
+    def test_prolific_author_is_merged_at_read_time(self):
+        """Посты популярного автора не копируются, а подмешиваются при
+        чтении ленты."""
+        Follow.objects.create(
+            user=TimelineTests.reader, author=TimelineTests.author
+        )
+        new_post = Post.objects.create(
+            text='Пост звезды', author=TimelineTests.author
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=TimelineTests.reader).exists()
+        )
+        self.assertEqual(
+            self.feed_ids(), [new_post.id, TimelineTests.old_post.id]
+        )
+
+    @override_settings(POSTS_TIMELINE_FANOUT_LIMIT=1)
+    def test_posts_stay_when_author_stops_being_prolific(self):
+        """Посты популярного автора остаются в ленте, когда число его
+        подписчиков падает до порога."""
+        star = User.objects.create_user(username='fading_star')
+        fan = User.objects.create_user(username='fading_fan')
+        Follow.objects.create(user=TimelineTests.reader, author=star)
+        Follow.objects.create(user=fan, author=star)
+        post = Post.objects.create(text='Пост звезды', author=star)
+        self.assertEqual(self.feed_ids(), [post.id])
+        Follow.objects.get(user=fan, author=star).delete()
+        self.assertEqual(self.feed_ids(), [post.id])
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=TimelineTests.reader, post=post
+        ).exists())
+
+    def follow_star_and_author(self):
+        """Лента из записей обычного автора и постов популярного, от новых
+        к старым."""
+        star = User.objects.create_user(username='timeline_star')
+        fan = User.objects.create_user(username='timeline_fan')
+        Follow.objects.create(user=TimelineTests.reader, author=star)
+        Follow.objects.create(user=fan, author=star)
+        Follow.objects.create(
+            user=TimelineTests.reader, author=TimelineTests.author
+        )
+        posts = [
+            Post.objects.create(text=f'Пост {number}', author=author)
+            for number, author in enumerate(
+                [star, TimelineTests.author] * 3
+            )
+        ]
+        self.assertFalse(
+            TimelineEntry.objects.filter(post__author=star).exists()
+        )
+        return [post.id for post in reversed(posts)] + [
+            TimelineTests.old_post.id
+        ]
+
+    @override_settings(
+        POSTS_TIMELINE_FANOUT_LIMIT=1, POSTS_PER_PAGE=2,
+        POSTS_PAGINATION='cursor'
+    )
+    def test_feed_cursor_pages_merge_timeline_and_prolific_posts(self):
+        """Курсорные страницы ленты сливают записи ленты и посты
+        популярных авторов по дате, не повторяя и не теряя посты."""
+        expected = self.follow_star_and_author()
+        seen = []
+        pages = []
+        cursor = None
+        while True:
+            data = {'cursor': cursor} if cursor else {}
+            with self.assertNumQueries(5):
+                page = self.authorized_client.get(
+                    reverse('follow_index'), data
+                ).context['page']
+            pages.append(page)
+            seen += [post.id for post in page]
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, expected)
+        back = self.authorized_client.get(
+            reverse('follow_index'), {'cursor': pages[-1].previous_cursor}
+        ).context['page']
+        self.assertEqual(
+            [post.id for post in back], [post.id for post in pages[-2]]
+        )
+
+    @override_settings(
+        POSTS_TIMELINE_FANOUT_LIMIT=1, POSTS_PER_PAGE=2,
+        POSTS_PAGINATION='page'
+    )
+    def test_feed_numbered_pages_merge_timeline_and_prolific_posts(self):
+        """Нумерованные страницы ленты сливают те же посты и считают
+        их без повторов."""
+        expected = self.follow_star_and_author()
+        seen = []
+        for number in range(1, 5):
+            page = self.authorized_client.get(
+                reverse('follow_index'), {'page': number}
+            ).context['page']
+            seen += [post.id for post in page]
+        self.assertEqual(seen, expected)
+        self.assertEqual(page.paginator.count, len(expected))
@@ -0,0 +1,126 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase
+from posts.models import AuthorStats, Comment, Follow, Group, Post
+from posts.models import TimelineEntry
+
+User = get_user_model()
+
+
+class TransferTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+        cls.group = Group.objects.create(
+            title='Перенос', slug='transfer', description='Описание'
+        )
+        cls.author = User.objects.create_user(username='transfer_author')
+        cls.reader = User.objects.create_user(username='transfer_reader')
+        cls.post = Post.objects.create(
+            text='Текст, с "кавычками"\nи строками', author=cls.author,
+            group=cls.group
+        )
+        cls.other_post = Post.objects.create(
+            text='Без группы', author=cls.reader
+        )
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory, ignore_errors=True)
+        super().tearDownClass()
+
+    def snapshot(self):
+        return {
+            'posts': list(Post.objects.order_by('pub_date').values_list(
+                'text', 'pub_date', 'author__username', 'group__slug'
+            )),
+            'comments': list(Comment.objects.values_list(
+                'post__text', 'author__username', 'text', 'created'
+            )),
+            'follows': list(Follow.objects.values_list(
+                'user__username', 'author__username'
+            )),
+        }
+
+    def call(self, *args):
+        call_command(*args, stdout=StringIO(), stderr=StringIO())
+
+    def test_round_trip(self):
+        """Выгрузка и загрузка в NDJSON и CSV восстанавливают данные,
+        счетчики, ленты и поиск."""
+        expected = self.snapshot()
+        for name in ('dump.ndjson', 'dump.csv.gz'):
+            with self.subTest(name=name):
+                path = os.path.join(TransferTests.directory, name)
+                self.call('export_posts', path)
+                Post.objects.all().delete()
+                Follow.objects.all().delete()
+                AuthorStats.objects.all().delete()
+                self.call('import_posts', path, '--batch-size', '1')
+                self.assertEqual(self.snapshot(), expected)
+                post = Post.objects.get(text__startswith='Текст')
+                self.assertEqual(post.comment_count, 1)
+                stats = AuthorStats.objects.get(user=TransferTests.author)
+                self.assertEqual(stats.followers, 1)
+                self.assertTrue(TimelineEntry.objects.filter(
+                    user=TransferTests.reader, post=post
+                ).exists())
+
+    def test_import_next_to_existing_posts(self):
+        """Загрузка в непустую базу не затирает посты и сохраняет связи
+        комментариев, новые пользователи создаются."""
+        path = os.path.join(TransferTests.directory, 'copy.ndjson')
+        self.call('export_posts', path)
+        User.objects.filter(username='transfer_reader').update(
+            username='renamed_reader'
+        )
+        self.call('import_posts', path)
+        self.assertEqual(Post.objects.count(), 4)
+        self.assertTrue(User.objects.filter(
+            username='transfer_reader'
+        ).exists())
+        self.assertEqual(
+            Comment.objects.filter(post__author=TransferTests.author).count(),
+            2
+        )
+        self.assertEqual(Group.objects.filter(slug='transfer').count(), 1)
+
+
+class BrokenDumpTests(TransactionTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_dangling_comment_names_its_line(self):
+        """Комментарий к посту, которого нет в выгрузке, останавливает
+        загрузку с номером строки."""
+        path = os.path.join(self.directory, 'broken.ndjson')
+        with open(path, 'w', encoding='utf-8') as dump:
+            dump.write(
+                '{"model": "post", "id": 1, "text": "Пост", '
+                '"pub_date": "2022-01-01T00:00:00+00:00", '
+                '"author": "dump_author", "group": null, "image": null}\n'
+                '\n'
+                '{"model": "comment", "post": 1, "author": "dump_author", '
+                '"text": "Есть", "created": "2022-01-02T00:00:00+00:00"}\n'
+                '{"model": "comment", "post": 999, "author": "dump_author", '
+                '"text": "Нет", "created": "2022-01-02T00:00:00+00:00"}\n'
+            )
+        with self.assertRaisesMessage(CommandError, 'line 4'):
+            call_command(
+                'import_posts', path, stdout=StringIO(), stderr=StringIO()
+            )
+        self.assertEqual(Post.objects.count(), 1)
+        self.assertFalse(Comment.objects.exists())
@@ -1,8 +1,9 @@
 from http import HTTPStatus
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
-from django.urls import reverse
+from django.test import Client, SimpleTestCase, TestCase
+from django.urls import reverse, set_script_prefix
+from posts.links import attach_urls
 from posts.models import Group, Post
 
 User = get_user_model()
@@ -120,3 +121,24 @@ class PostURLTests(TestCase):
             with self.subTest():
                 response = self.authorized_client.get(adress)
                 self.assertTemplateUsed(response, template)
+
+
+class CardLinksTests(SimpleTestCase):
+    def test_links_match_reverse(self):
+        """Ссылки карточки совпадают с reverse(), в том числе с префиксом."""
+        author = User(username='user.name+1@x')
+        post = Post(id=7, author=author, group=Group(id=1, slug='slug-1'))
+        for prefix in ('/', '/yatube/'):
+            set_script_prefix(prefix)
+            self.addCleanup(set_script_prefix, '/')
+            attach_urls([post])
+            self.assertEqual(post.profile_url, reverse(
+                'profile', args=[author.username]
+            ))
+            self.assertEqual(post.post_url, reverse(
+                'post', args=[author.username, 7]
+            ))
+            self.assertEqual(post.edit_url, reverse(
+                'post_edit', args=[author.username, 7]
+            ))
+            self.assertEqual(post.group_url, reverse('group', args=['slug-1']))
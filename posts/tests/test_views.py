@@ -13,7 +13,11 @@ User = get_user_model()
 TEST_DIR = 'test_data'
 
 
-@override_settings(MEDIA_ROOT=(TEST_DIR + '/media'))
+# The tests read response.context, which a page served from the cache of
+# anonymous pages does not have
+@override_settings(
+    MEDIA_ROOT=(TEST_DIR + '/media'), POSTS_PAGE_CACHE_TIMEOUT=0
+)
 class PostPagesTests(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -62,6 +66,7 @@ class PostPagesTests(TestCase):
         super().tearDownClass()
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.user = PostPagesTests.user
         self.authorized_client = Client()
@@ -179,19 +184,25 @@ class PostPagesTests(TestCase):
         self.check_context_is_correct(post_context)
 
     def test_check_cache_at_index_page(self):
-        """Проверка кэша главной страницы"""
-        response = self.guest_client.get(reverse('index'))
+        """Карточки главной страницы берутся из кэша, новый пост и
+        правка поста видны сразу."""
+        cache.clear()
+        self.guest_client.get(reverse('index'))
+        self.assertTrue(cache.get_many([
+            f'post_card:{PostPagesTests.post.id}:'
+            f'{PostPagesTests.post.version}:short'
+        ]))
         Post.objects.create(
             text='Новый текст',
             author=PostPagesTests.user,
         )
-        second_response = self.guest_client.get(reverse('index'))
-        self.assertEqual(response.content, second_response.content)
-        cache.clear()
-        response_after_clear_cache = self.guest_client.get(reverse('index'))
-        self.assertNotEqual(
-            second_response.content, response_after_clear_cache.content
-        )
+        response = self.guest_client.get(reverse('index'))
+        self.assertContains(response, 'Новый текст')
+        post = Post.objects.get(pk=PostPagesTests.post.pk)
+        post.text = 'Исправленный текст'
+        post.save()
+        response = self.guest_client.get(reverse('index'))
+        self.assertContains(response, 'Исправленный текст')
 
     def test_authorized_user_can_folow(self):
         """Авторизованный пользователь может подписываться
@@ -274,6 +285,7 @@ class PostPagesTests(TestCase):
         self.assertEqual(comment_count + 1, Comment.objects.count())
 
 
+@override_settings(POSTS_PAGE_CACHE_TIMEOUT=0)
 class PaginatorViewsTest(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -286,6 +298,8 @@ class PaginatorViewsTest(TestCase):
         )
 
     def setUp(self):
+        # bulk_create bumps no tags: drop page counts cached by other tests
+        cache.clear()
         # создаем неавторизованного пользователя
         self.guest_client = Client()
 
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+
+class QueryBudgetMixin:
+    """Проверка, что страница укладывается в бюджет SQL-запросов
+    из settings.QUERY_BUDGETS."""
+
+    def assertWithinQueryBudget(self, client, url):
+        url_name = resolve(url.split('?')[0]).view_name
+        budget = settings.QUERY_BUDGETS[url_name]
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        if len(queries) > budget:
+            self.fail(
+                f'{url} ran {len(queries)} queries, budget of {url_name} '
+                f'is {budget}:\n' + '\n'.join(
+                    query['sql'] for query in queries.captured_queries
+                )
+            )
+        return response
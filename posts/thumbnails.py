@@ -0,0 +1,194 @@
+import logging
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Now
+
+from .jobs import enqueue, job
+
+logger = logging.getLogger(__name__)
+
+# The only thumbnail the templates show: the picture of a post card
+CARD_GEOMETRY = '960x339'
+CARD_OPTIONS = {'crop': 'center', 'upscale': True}
+
+_executor = None
+
+
+class LRUCache:
+    """Small thread-safe in-process LRU of hot thumbnail URLs."""
+
+    def __init__(self, size):
+        self.size = size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+hot_urls = LRUCache(settings.POSTS_THUMBNAIL_LRU_SIZE)
+
+
+def _url_key(image_name):
+    return f'thumb_url:{CARD_GEOMETRY}:{image_name}'
+
+
+def remember(image_name, url):
+    hot_urls.set(image_name, url)
+    cache.set(_url_key(image_name), url, None)
+
+
+def resolve(posts):
+    """Fill thumbnail_url of posts that lack it with one batched lookup.
+
+    Known URLs come from the in-process LRU, then from one cache.get_many
+    for the whole page. Read-only: a post whose thumbnail was never built
+    shows its original image, thumbnails are built when an image is
+    uploaded (schedule) or by `manage.py warm_thumbnails`.
+    """
+    pending = [
+        post for post in posts
+        if post.image and not post.thumbnail_url and not post.renditions
+    ]
+    if not pending:
+        return
+    names = {post.image.name for post in pending}
+    found = {}
+    for name in names:
+        url = hot_urls.get(name)
+        if url:
+            found[name] = url
+    missing = [name for name in names if name not in found]
+    if missing:
+        stored = cache.get_many([_url_key(name) for name in missing])
+        for name in missing:
+            url = stored.get(_url_key(name))
+            if url:
+                hot_urls.set(name, url)
+                found[name] = url
+    for post in pending:
+        url = found.get(post.image.name)
+        if url:
+            post.thumbnail_url = url
+
+
+def generate(post_id):
+    """Build the card thumbnail of the post and store its URL on the post."""
+    from sorl.thumbnail import get_thumbnail
+
+    from .models import Post
+
+    post = Post.objects.filter(pk=post_id).only('pk', 'image').first()
+    if post is None or not post.image:
+        return None
+    thumbnail = get_thumbnail(post.image, CARD_GEOMETRY, **CARD_OPTIONS)
+    remember(post.image.name, thumbnail.url)
+    Post.objects.filter(pk=post_id, image=post.image.name).update(
+        thumbnail_url=thumbnail.url, version=F('version') + 1,
+        updated=Now()
+    )
+    return thumbnail.url
+
+
+def _init_worker():
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    django.setup()
+
+
+@job()
+def build_thumbnail(post_id):
+    """Queued generate(): failures are retried by the job queue."""
+    generate(post_id)
+
+
+def build(post_id):
+    """generate() that logs failures instead of raising them."""
+    try:
+        return generate(post_id)
+    except Exception:
+        logger.exception('Thumbnail of post %s failed', post_id)
+
+
+def make_executor(max_workers):
+    # spawn: a forked child would share the parent's DB connection
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+    )
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = make_executor(settings.POSTS_THUMBNAIL_WORKERS)
+    return _executor
+
+
+def submit(post_id):
+    """build() in the process pool, started again if a worker died.
+
+    A pool with a dead worker refuses every new task: it is dropped and
+    a new one takes the task. If that fails too the post keeps showing
+    its original image.
+    """
+    global _executor
+    for _ in range(2):
+        executor = get_executor()
+        try:
+            return executor.submit(build, post_id)
+        except BrokenProcessPool:
+            logger.warning('Thumbnail pool is broken, starting a new one')
+            if _executor is executor:
+                _executor = None
+            executor.shutdown(wait=False)
+    logger.error('Thumbnail of post %s was not queued', post_id)
+    return None
+
+
+def schedule(post):
+    """Queue the thumbnails of a freshly uploaded image.
+
+    They are built by the job queue when it has a worker, otherwise by
+    the process pool, or inside the request with
+    POSTS_THUMBNAIL_WORKERS = 0. Masters stored by posts.images (with a
+    known size) get renditions instead and need none.
+    """
+    if not post.image or post.image_width or post.renditions:
+        return
+    if not settings.JOBS_ALWAYS_EAGER:
+        enqueue(
+            build_thumbnail, {'post_id': post.pk},
+            key=f'thumbnail:{post.pk}'
+        )
+        return
+    if not settings.POSTS_THUMBNAIL_WORKERS:
+        build(post.pk)
+        return
+    transaction.on_commit(lambda: submit(post.pk))
@@ -0,0 +1,254 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+
+from .jobs import job
+from .models import AuthorStats, Follow, Post, TimelineEntry
+from .paginator import CURSOR_MODE, CursorPaginator
+
+BATCH_SIZE = 1000
+
+
+def is_prolific(author_id):
+    """Posts of prolific authors are merged in at read time, not fanned out."""
+    return AuthorStats.objects.filter(
+        user_id=author_id,
+        followers__gt=settings.POSTS_TIMELINE_FANOUT_LIMIT
+    ).exists()
+
+
+def fan_out(post):
+    if is_prolific(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    _bulk_add(
+        TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+        for user_id in followers.iterator()
+    )
+
+
+def backfill(user_id, author_id):
+    if is_prolific(author_id):
+        return
+    posts = Post.objects.filter(author_id=author_id).values_list(
+        'id', 'pub_date'
+    )[:settings.POSTS_TIMELINE_BACKFILL]
+    _bulk_add(
+        TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+        for post_id, pub_date in posts
+    )
+
+
+def left_prolific(author_id):
+    """Whether an unfollow just took the author down to the limit."""
+    return AuthorStats.objects.filter(
+        user_id=author_id, followers=settings.POSTS_TIMELINE_FANOUT_LIMIT
+    ).exists()
+
+
+def backfill_followers(author_id):
+    """Copy the latest posts of the author to every follower's timeline."""
+    posts = list(Post.objects.filter(author_id=author_id).values_list(
+        'id', 'pub_date'
+    )[:settings.POSTS_TIMELINE_BACKFILL])
+    followers = Follow.objects.filter(
+        author_id=author_id
+    ).values_list('user_id', flat=True)
+    _bulk_add(
+        TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+        for user_id in followers.iterator()
+        for post_id, pub_date in posts
+    )
+
+
+def trim(user_id, author_id):
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id
+    ).delete()
+
+
+@job()
+def fan_out_post(post_id):
+    post = Post.objects.filter(pk=post_id).only(
+        'id', 'author_id', 'pub_date'
+    ).first()
+    # Deleted before the job ran: its entries are gone with it
+    if post is not None:
+        fan_out(post)
+
+
+@job()
+def backfill_follow(user_id, author_id):
+    # The queue may run it after an unfollow
+    if Follow.objects.filter(user_id=user_id, author_id=author_id).exists():
+        backfill(user_id, author_id)
+
+
+@job()
+def trim_follow(user_id, author_id):
+    # ... or after the user followed the author again
+    if not Follow.objects.filter(
+        user_id=user_id, author_id=author_id
+    ).exists():
+        trim(user_id, author_id)
+
+
+@job()
+def fan_out_author(author_id):
+    # The posts of a prolific author were merged in at read time and never
+    # fanned out: once the author is not prolific they must be copied.
+    if not is_prolific(author_id):
+        backfill_followers(author_id)
+
+
+def rebuild():
+    """Fill the timelines from the follows in one statement.
+
+    For rows loaded without signals (bulk_create, imports): every
+    follower gets the latest POSTS_TIMELINE_BACKFILL posts of the
+    authors that are not prolific. The author stats must be up to date.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'''
+            INSERT INTO {TimelineEntry._meta.db_table}
+                (user_id, post_id, pub_date)
+            SELECT user_id, post_id, pub_date FROM (
+                SELECT f.user_id AS user_id, p.id AS post_id,
+                       p.pub_date AS pub_date,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY f.user_id, f.author_id
+                           ORDER BY p.pub_date DESC
+                       ) AS position
+                FROM {Follow._meta.db_table} f
+                JOIN {Post._meta.db_table} p ON p.author_id = f.author_id
+                JOIN {AuthorStats._meta.db_table} s
+                    ON s.user_id = f.author_id
+                WHERE s.followers <= %s
+            ) ranked
+            WHERE position <= %s
+            ON CONFLICT DO NOTHING
+        ''', [
+            settings.POSTS_TIMELINE_FANOUT_LIMIT,
+            settings.POSTS_TIMELINE_BACKFILL,
+        ])
+
+
+def prolific_followed(user):
+    """Subquery of the prolific authors the user follows."""
+    return AuthorStats.objects.filter(
+        user_id__in=Follow.objects.filter(user=user).values('author_id'),
+        followers__gt=settings.POSTS_TIMELINE_FANOUT_LIMIT
+    ).values('user_id')
+
+
+def feed(user):
+    """Posts of the authors the user follows, newest first.
+
+    The whole feed in one queryset, for counts and checks: pages of it
+    come from feed_page().
+    """
+    entries = TimelineEntry.objects.filter(user=user).values('post_id')
+    return Post.objects.filter(
+        Q(id__in=entries) | Q(author_id__in=prolific_followed(user))
+    )
+
+
+def merge_keys(entries, posts, limit, newest_first=True):
+    """The first limit (pub_date, id) keys of timeline entries and posts.
+
+    A post of an author who became prolific after its fan-out is in both:
+    it is counted once.
+    """
+    order = '-' if newest_first else ''
+    keys = set(entries.order_by(
+        f'{order}pub_date', f'{order}post_id'
+    ).values_list('pub_date', 'post_id')[:limit])
+    keys.update(posts.order_by(
+        f'{order}pub_date', f'{order}id'
+    ).values_list('pub_date', 'id')[:limit])
+    return sorted(keys, reverse=newest_first)[:limit]
+
+
+def load_posts(keys):
+    """Posts of the keys, in their order."""
+    found = Post.objects.select_related('author', 'group').in_bulk(
+        [post_id for _, post_id in keys]
+    )
+    return [found[post_id] for _, post_id in keys if post_id in found]
+
+
+class FeedPosts:
+    """The follow feed of a user as a sequence for Paginator.
+
+    A slice reads (pub_date, id) keys from the timeline of the user,
+    along its (user, pub_date) index, and from the posts of the prolific
+    authors the user follows, along the (author, pub_date) index of the
+    posts. The keys of both are merged and only the posts of the slice
+    are loaded, by id.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    def count(self):
+        # UNION drops the posts that are in both
+        entries = TimelineEntry.objects.filter(user=self.user)
+        posts = Post.objects.filter(author_id__in=prolific_followed(self.user))
+        return entries.order_by().values('post_id').union(
+            posts.order_by().values('id')
+        ).count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        # Paginator only takes slices of its object list
+        keys = merge_keys(
+            TimelineEntry.objects.filter(user=self.user),
+            Post.objects.filter(author_id__in=prolific_followed(self.user)),
+            index.stop
+        )
+        return load_posts(keys[index.start:])
+
+
+class TimelinePaginator(CursorPaginator):
+    """Cursor pages of the follow feed of a user, read like FeedPosts."""
+
+    def __init__(self, user, per_page):
+        super().__init__(Post.objects.all(), per_page)
+        self.user = user
+
+    def fetch(self, values, forward):
+        entries = TimelineEntry.objects.filter(user=self.user)
+        posts = Post.objects.filter(author_id__in=prolific_followed(self.user))
+        if values is not None:
+            entries = entries.filter(self._keyset_filter(
+                values, forward, ('pub_date', 'post_id')
+            ))
+            posts = posts.filter(self._keyset_filter(values, forward))
+        return load_posts(merge_keys(
+            entries, posts, self.per_page + 1, forward == self.descending
+        ))
+
+
+def feed_page(request, user):
+    """Page of the follow feed of the user, in the POSTS_PAGINATION mode."""
+    if settings.POSTS_PAGINATION == CURSOR_MODE:
+        paginator = TimelinePaginator(user, settings.POSTS_PER_PAGE)
+        return paginator.get_page(request.GET.get('cursor'))
+    paginator = Paginator(FeedPosts(user), settings.POSTS_PER_PAGE)
+    return paginator.get_page(request.GET.get('page'))
+
+
+def _bulk_add(entries):
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= BATCH_SIZE:
+            TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
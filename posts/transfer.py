@@ -0,0 +1,276 @@
+"""Streaming export and import of groups, posts, comments and follows.
+
+A dump is a stream of records, dicts with a 'model' key: groups first,
+then posts, comments and follows. It is written as NDJSON, one record a
+line, or as CSV with the union of the fields of all models as header.
+Users are referred to by username and groups by slug, comments refer to
+posts by their id in the dump.
+
+The import reads the stream once and saves it in batches of bulk_create.
+Post ids are shifted past the largest id already in the database, so a
+comment finds its post without a map of all ids and the memory used does
+not grow with the dump. Users missing in the database are created
+without a usable password. No signals are sent: counters, timelines
+and the search index are rebuilt afterwards by import_posts.
+"""
+import csv
+import json
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Max
+from django.utils.dateparse import parse_datetime
+
+from .models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+BATCH_SIZE = 5000
+CSV_FIELDS = (
+    'model', 'id', 'slug', 'title', 'description', 'text', 'pub_date',
+    'author', 'group', 'image', 'post', 'created', 'user',
+)
+
+
+def export_records():
+    groups = Group.objects.order_by('pk').values_list(
+        'slug', 'title', 'description'
+    )
+    for slug, title, description in groups.iterator():
+        yield {
+            'model': 'group', 'slug': slug, 'title': title,
+            'description': description,
+        }
+    posts = Post.objects.order_by('pk').values_list(
+        'id', 'text', 'pub_date', 'author__username', 'group__slug', 'image'
+    )
+    for post_id, text, pub_date, author, group, image in posts.iterator():
+        yield {
+            'model': 'post', 'id': post_id, 'text': text,
+            'pub_date': pub_date.isoformat(), 'author': author,
+            'group': group, 'image': image or None,
+        }
+    comments = Comment.objects.order_by('pk').values_list(
+        'post_id', 'author__username', 'text', 'created'
+    )
+    for post_id, author, text, created in comments.iterator():
+        yield {
+            'model': 'comment', 'post': post_id, 'author': author,
+            'text': text, 'created': created.isoformat(),
+        }
+    follows = Follow.objects.order_by('pk').values_list(
+        'user__username', 'author__username'
+    )
+    for user, author in follows.iterator():
+        yield {'model': 'follow', 'user': user, 'author': author}
+
+
+def write_records(records, stream, fmt):
+    """Write the records to a text stream, yield after each one."""
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, CSV_FIELDS)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            yield record
+        return
+    for record in records:
+        stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        yield record
+
+
+def read_records(stream, fmt):
+    """(line number, record) of each record of the stream."""
+    if fmt == 'csv':
+        # CSV has no null: a missing group or image is an empty string
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for number, line in enumerate(stream, start=1):
+        if line.strip():
+            yield number, json.loads(line)
+
+
+class RecordError(Exception):
+    """A record of the dump the database refused, e.g. a comment of a
+    post that is not in the dump."""
+
+    def __init__(self, line, error):
+        super().__init__(f'line {line}: {error}')
+        self.line = line
+
+
+@contextmanager
+def keep_dates(*models):
+    """Let bulk_create store the dates of the dump instead of now()."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Importer:
+    """Saves a stream of records in batches, one transaction per batch.
+
+    progress(counts) is called after every batch.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, progress=None):
+        self.batch_size = batch_size
+        self.progress = progress
+        # 'user' counts the users created for the dump
+        self.counts = dict.fromkeys(
+            ('group', 'post', 'comment', 'follow', 'user'), 0
+        )
+        self.groups = {}
+        self.post_offset = Post.objects.aggregate(Max('id'))['id__max'] or 0
+        self.savers = {
+            'group': self.save_groups, 'post': self.save_posts,
+            'comment': self.save_comments, 'follow': self.save_follows,
+        }
+        self.models = {
+            'group': Group, 'post': Post, 'comment': Comment,
+            'follow': Follow,
+        }
+        self.model = None
+        self.batch = []
+        self.lines = []
+
+    def run(self, records):
+        """Save the (line number, record) pairs of read_records()."""
+        with keep_dates(Post, Comment):
+            for line, record in records:
+                model = record['model']
+                if model not in self.savers:
+                    raise ValueError(f'Unknown model {model!r} in the dump.')
+                if model != self.model or len(self.batch) >= self.batch_size:
+                    self.flush()
+                    self.model = model
+                self.batch.append(record)
+                self.lines.append(line)
+            self.flush()
+        self.reset_sequences()
+        return self.counts
+
+    def flush(self):
+        if not self.batch:
+            return
+        try:
+            with transaction.atomic():
+                self.savers[self.model](self.batch)
+        except IntegrityError as exc:
+            raise RecordError(self.broken_line(), exc) from exc
+        self.counts[self.model] += len(self.batch)
+        self.batch = []
+        self.lines = []
+        if self.progress:
+            self.progress(self.counts)
+
+    def broken_line(self):
+        """Line of the first record of the batch that fails on its own."""
+        table = self.models[self.model]._meta.db_table
+        for line, record in zip(self.lines, self.batch):
+            try:
+                with transaction.atomic():
+                    self.savers[self.model]([record])
+                    # Foreign keys may only be checked at the commit
+                    connection.check_constraints(table_names=[table])
+                    transaction.set_rollback(True)
+            except IntegrityError:
+                return line
+        return self.lines[0]
+
+    def user_ids(self, usernames):
+        """Ids of the users of a batch, creating the missing ones."""
+        usernames = set(usernames)
+        found = dict(User.objects.filter(
+            username__in=usernames
+        ).values_list('username', 'pk'))
+        missing = usernames - found.keys()
+        if missing:
+            User.objects.bulk_create([
+                User(username=username, password=make_password(None))
+                for username in missing
+            ], ignore_conflicts=True)
+            found.update(User.objects.filter(
+                username__in=missing
+            ).values_list('username', 'pk'))
+            self.counts['user'] += len(missing)
+        return found
+
+    def group_ids(self, slugs):
+        missing = {slug for slug in slugs if slug and slug not in self.groups}
+        if missing:
+            self.groups.update(Group.objects.filter(
+                slug__in=missing
+            ).values_list('slug', 'pk'))
+        return self.groups
+
+    def save_groups(self, batch):
+        Group.objects.bulk_create([
+            Group(
+                slug=record['slug'], title=record['title'],
+                description=record['description'] or ''
+            )
+            for record in batch
+        ], ignore_conflicts=True)
+
+    def save_posts(self, batch):
+        users = self.user_ids(record['author'] for record in batch)
+        groups = self.group_ids(record['group'] for record in batch)
+        posts = []
+        for record in batch:
+            pub_date = parse_datetime(record['pub_date'])
+            posts.append(Post(
+                id=int(record['id']) + self.post_offset,
+                text=record['text'], pub_date=pub_date, updated=pub_date,
+                author_id=users[record['author']],
+                group_id=groups.get(record['group']),
+                image=record['image'] or None,
+            ))
+        Post.objects.bulk_create(posts)
+
+    def save_comments(self, batch):
+        users = self.user_ids(record['author'] for record in batch)
+        Comment.objects.bulk_create([
+            Comment(
+                post_id=int(record['post']) + self.post_offset,
+                author_id=users[record['author']], text=record['text'],
+                created=parse_datetime(record['created']),
+            )
+            for record in batch
+        ])
+
+    def save_follows(self, batch):
+        users = self.user_ids(
+            username for record in batch
+            for username in (record['user'], record['author'])
+        )
+        Follow.objects.bulk_create([
+            Follow(
+                user_id=users[record['user']],
+                author_id=users[record['author']]
+            )
+            for record in batch if record['user'] != record['author']
+        ], ignore_conflicts=True)
+
+    def reset_sequences(self):
+        # Posts were saved with explicit ids
+        statements = connection.ops.sequence_reset_sql(no_style(), [Post])
+        if statements:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
@@ -1,17 +1,26 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
+
+# The feed views are async when served by yatube/asgi.py
+feeds = async_views if settings.POSTS_ASYNC_VIEWS else views
 
 urlpatterns = [
-    path('', views.index, name='index'),
-    path('follow/', views.follow_index, name='follow_index'),
-    path('group/<slug:slug>/', views.group_posts, name='group'),
+    path('', feeds.index, name='index'),
+    path('follow/', feeds.follow_index, name='follow_index'),
+    path('group/<slug:slug>/', feeds.group_posts, name='group'),
     path('new/', views.new_post, name='new_post'),
-    path('<str:username>/', views.profile, name='profile'),
-    path('<str:username>/<int:post_id>/', views.post_view, name='post'),
+    path('search/', views.search_posts, name='search'),
+    path('<str:username>/', feeds.profile, name='profile'),
+    path('<str:username>/<int:post_id>/', feeds.post_view, name='post'),
     path(
         '<str:username>/<int:post_id>/edit/', views.post_edit, name='post_edit'
     ),
+    path(
+        '<str:username>/<int:post_id>/comments/',
+        views.post_comments, name='post_comments'
+    ),
     path(
         '<username>/<int:post_id>/comment/',
         views.add_comment, name='add_comment'
@@ -1,33 +1,60 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render, reverse
 
-from .forms import CommentForm, PostForm
+from .api import comment_data
+from .conditional import conditional_page, page_state
+from .counters import get_stats
+from .forms import CommentForm, PostForm, SearchForm
+from .links import attach_urls
+from . import search, thumbnails
 from .models import Comment, Follow, Group, Post
+from .page_cache import cache_anonymous_page
+from .paginator import CursorPaginator, get_page
+from .streaming import render_page
+from .timeline import feed, feed_page
 
 User = get_user_model()
 
+# Author counters shown next to the posts, part of the page validators
+AUTHOR_STATS = (
+    'author__stats__followers', 'author__stats__following',
+    'author__stats__posts',
+)
 
+
+def index_state(request):
+    return page_state(request, Post.objects.all(), 'index')
+
+
+@cache_anonymous_page('index')
+@conditional_page(index_state)
 def index(request):
     is_index = True
-    post_list = Post.objects.select_related('author').all()
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
-    return render(request, 'posts/index.html', {
+    post_list = Post.objects.select_related('author', 'group').all()
+    page = get_page(request, post_list, tag='index')
+    return render_page(request, 'posts/index.html', {
         'page': page,
         'post_list': post_list, 'is_index': is_index
     })
 
 
+def group_state(request, slug):
+    return page_state(
+        request, Post.objects.filter(group__slug=slug), f'group:{slug}',
+        'group__title', 'group__description'
+    )
+
+
+@cache_anonymous_page('group:{slug}')
+@conditional_page(group_state)
 def group_posts(request, slug):
     is_group = True
     group = get_object_or_404(Group, slug=slug)
-    group_posts = group.posts.select_related('author').all()
-    paginator = Paginator(group_posts, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    group_posts = group.posts.select_related('author', 'group').all()
+    page = get_page(request, group_posts, tag=f'group:{slug}')
     return render(request, 'posts/group.html', {
         'group': group, 'page': page,
         'group_posts': group_posts,
@@ -42,41 +69,122 @@ def new_post(request):
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        thumbnails.schedule(post)
         return redirect('index')
     return render(request, 'posts/new_post.html', {'form': form})
 
 
+def search_posts(request):
+    form = SearchForm(request.GET or None)
+    page = None
+    if form.is_valid():
+        group = form.cleaned_data['group']
+        results = search.search(
+            form.cleaned_data['q'],
+            group=group.slug if group else None,
+            author=form.cleaned_data['author'],
+        ).select_related('author', 'group')
+        paginator = CursorPaginator(
+            results, settings.POSTS_PER_PAGE, ordering=('-rank', '-id')
+        )
+        page = paginator.get_page(request.GET.get('cursor'))
+    return render(request, 'posts/search.html', {
+        'form': form, 'page': page
+    })
+
+
+def profile_state(request, username):
+    return page_state(
+        request, Post.objects.filter(author__username=username),
+        f'author:{username}', *AUTHOR_STATS
+    )
+
+
+@cache_anonymous_page('author:{username}')
+@conditional_page(profile_state)
 def profile(request, username):
     is_following = False
     is_profile = True
     user = get_object_or_404(User, username=username)
-    post_list = Post.objects.filter(author=user)
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    post_list = Post.objects.filter(author=user).select_related(
+        'author', 'group'
+    )
+    page = get_page(request, post_list, tag=f'author:{username}')
     if request.user.is_authenticated:
         is_following = Follow.objects.filter(
             user=request.user, author=user
         ).exists()
-    return render(request, 'posts/profile.html', {
+    return render_page(request, 'posts/profile.html', {
         'post_list': post_list,
         'page': page, 'author': user,
+        'stats': get_stats(user),
         'is_profile': is_profile,
         'following': is_following
     })
 
 
+def post_state(request, username, post_id):
+    row = Post.objects.filter(
+        id=post_id, author__username=username
+    ).values_list('version', 'updated', *AUTHOR_STATS).first()
+    if row is None:
+        return None
+    return [row, request.GET.get('cursor')], row[1]
+
+
+@cache_anonymous_page('post:{post_id}', 'author:{username}')
+@conditional_page(post_state)
 def post_view(request, username, post_id):
     is_post = True
-    post = get_object_or_404(Post, id=post_id, author__username=username)
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'),
+        id=post_id, author__username=username
+    )
+    attach_urls([post])
     form = CommentForm(request.POST or None)
-    comments = Comment.objects.filter(post=post)
-    return render(request, 'posts/post.html', {
+    comments = Comment.objects.filter(post=post).select_related('author')
+    comment_page = get_comments_page(comments, request.GET.get('cursor'))
+    return render_page(request, 'posts/post.html', {
         'post': post, 'author': post.author, 'comments': comments,
+        'comment_page': comment_page,
+        'stats': get_stats(post.author),
         'form': form, 'is_post': is_post
     })
 
 
+def get_comments_page(comments, cursor=None):
+    """Newest comments first, starting after the cursor."""
+    paginator = CursorPaginator(
+        comments, settings.POSTS_COMMENTS_PER_PAGE,
+        ordering=('-created', '-id')
+    )
+    return paginator.get_page(cursor)
+
+
+def post_comments(request, username, post_id):
+    """Next chunk of comments: an HTML fragment, or JSON on ?format=json."""
+    post = get_object_or_404(
+        Post.objects.select_related('author'),
+        id=post_id, author__username=username
+    )
+    comments = Comment.objects.filter(post=post).select_related('author')
+    comment_page = get_comments_page(comments, request.GET.get('cursor'))
+    if request.GET.get('format') != 'json':
+        return render(request, 'posts/includes/comment_list.html', {
+            'post': post, 'comment_page': comment_page
+        })
+    next_url = None
+    if comment_page.has_next():
+        next_url = (
+            reverse('post_comments', args=[username, post_id])
+            + f'?format=json&cursor={comment_page.next_cursor}'
+        )
+    return JsonResponse({
+        'comments': [comment_data(comment) for comment in comment_page],
+        'next': next_url,
+    })
+
+
 @login_required
 def post_edit(request, username, post_id):
     post = get_object_or_404(Post, id=post_id, author__username=username)
@@ -88,7 +196,10 @@ def post_edit(request, username, post_id):
         instance=post
     )
     if form.is_valid():
+        image_changed = 'image' in form.changed_data
         form.save()
+        if image_changed:
+            thumbnails.schedule(post)
         return redirect(reverse('post', args=[username, post_id]))
     return render(request, 'posts/new_post.html', {'form': form, 'post': post})
 
@@ -110,15 +221,11 @@ def add_comment(request, username, post_id):
 
 @login_required
 def follow_index(request):
-    favor_posts = Post.objects.filter(
-        author__following__user=request.user
-    )
-    paginator = Paginator(favor_posts, 10)
-    page_number = request.GET.get('page')
-    page = paginator.get_page(page_number)
+    favor_posts = feed(request.user).select_related('author', 'group')
+    page = feed_page(request, request.user)
     return render(request, 'posts/follow.html', {
         'favor_posts': favor_posts,
-        'paginator': paginator,
+        'paginator': page.paginator,
         'page': page
     })
 
@@ -127,10 +234,7 @@ def follow_index(request):
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if request.user != author:
-        if not Follow.objects.filter(
-            user=request.user, author=author
-        ).exists():
-            Follow.objects.create(user=request.user, author=author)
+        Follow.objects.get_or_create(user=request.user, author=author)
     return redirect(reverse('profile', args=[username]))
 
 
@@ -1,5 +1,12 @@
 from storages.backends.s3boto3 import S3Boto3Storage
 
+from yatube.storage import ContentAddressedMixin
+
 
 MediaRootS3BotoStorage  = lambda: S3Boto3Storage(location='media') 
-StaticRootS3BotoStorage = lambda: S3Boto3Storage(location='static')  
\ No newline at end of file
+StaticRootS3BotoStorage = lambda: S3Boto3Storage(location='static')  
+
+
+class MediaStorage(ContentAddressedMixin, S3Boto3Storage):
+    """Post images in the bucket, named by their content."""
+    location = 'media'
@@ -0,0 +1,36 @@
+"""CACHES configuration from the CACHE_URL environment variable.
+
+    locmem://               per-process memory (default, not shared)
+    file:///var/tmp/yatube  files shared by every worker on the host
+    db://yatube_cache       table in the default database
+                            (create it with manage.py createcachetable)
+    redis://localhost:6379/0
+                            any Redis-protocol server, via django-redis
+
+Every backend except locmem is shared by all gunicorn workers.
+"""
+from urllib.parse import urlparse
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'redis': 'django_redis.cache.RedisCache',
+}
+
+
+def cache_from_url(url, key_prefix=''):
+    parsed = urlparse(url)
+    if parsed.scheme not in BACKENDS:
+        raise ValueError(f'Unsupported CACHE_URL scheme: {parsed.scheme}')
+    config = {
+        'BACKEND': BACKENDS[parsed.scheme],
+        'KEY_PREFIX': key_prefix,
+    }
+    if parsed.scheme == 'file':
+        config['LOCATION'] = parsed.path
+    elif parsed.scheme == 'db':
+        config['LOCATION'] = parsed.netloc or 'yatube_cache'
+    elif parsed.scheme == 'redis':
+        config['LOCATION'] = url
+    return config
@@ -0,0 +1,150 @@
+"""Per-process pool of database connections.
+
+Django opens a connection per thread and, with CONN_MAX_AGE = 0, closes
+it at the end of every request; over TLS to a hosted PostgreSQL that is
+a handshake and an authentication per request. The pooled backend in
+yatube.db.postgresql hands the closed connections back to a
+ConnectionPool instead, and the next request of any thread of the worker
+takes one from it.
+"""
+import threading
+import time
+from collections import deque
+
+from django.dispatch import Signal
+
+# Sent on every checkout with the seconds spent waiting for a free slot
+connection_checked_out = Signal()
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Thread-safe pool of at most max_size connections.
+
+    connect() opens a connection, check(connection) returns False for a
+    broken one and close(connection) closes it. A connection idle for
+    more than check_after seconds is checked before it is handed out,
+    one older than max_lifetime seconds is replaced. Without a free
+    connection checkout() waits up to timeout seconds.
+    """
+
+    def __init__(self, connect, check, close, max_size, timeout=10,
+                 check_after=30, max_lifetime=None):
+        self.connect = connect
+        self.check = check
+        self.close = close
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_after = check_after
+        self.max_lifetime = max_lifetime
+        # (connection, created, last used), the most recent on the right
+        self._idle = deque()
+        self._created = {}
+        self._size = 0
+        self._condition = threading.Condition()
+        self.stats = {
+            'created': 0, 'reused': 0, 'discarded': 0,
+            'waits': 0, 'wait_time': 0.0, 'max_wait': 0.0, 'timeouts': 0,
+        }
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+    def checkout(self):
+        started = time.monotonic()
+        deadline = started + self.timeout
+        entry = None
+        with self._condition:
+            while not self._idle and self._size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats['timeouts'] += 1
+                    raise PoolTimeout(
+                        f'No free connection in {self.timeout}s, '
+                        f'all {self.max_size} are in use.'
+                    )
+                self._condition.wait(remaining)
+            if self._idle:
+                # The most recently used one is the least likely to be stale
+                entry = self._idle.pop()
+            else:
+                self._size += 1
+            waited = time.monotonic() - started
+            if waited > 0.001:
+                self.stats['waits'] += 1
+            self.stats['wait_time'] += waited
+            self.stats['max_wait'] = max(self.stats['max_wait'], waited)
+        connection_checked_out.send(sender=self.__class__, wait=waited)
+        if entry is not None:
+            connection, created, last_used = entry
+            if self._healthy(connection, created, last_used):
+                self.stats['reused'] += 1
+                return connection
+            # Keep the slot and open a replacement in it
+            self._close(connection)
+        return self._open()
+
+    def checkin(self, connection, discard=False):
+        created = self._created.get(id(connection), 0)
+        if discard or self._expired(created):
+            self._close(connection)
+            self._release_slot()
+            return
+        with self._condition:
+            self._idle.append((connection, created, time.monotonic()))
+            self._condition.notify()
+
+    def close_all(self):
+        with self._condition:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for connection, created, last_used in idle:
+            self._close(connection)
+
+    def _open(self):
+        try:
+            connection = self.connect()
+        except Exception:
+            self._release_slot()
+            raise
+        self._created[id(connection)] = time.monotonic()
+        self.stats['created'] += 1
+        return connection
+
+    def _close(self, connection):
+        self._created.pop(id(connection), None)
+        self.stats['discarded'] += 1
+        try:
+            self.close(connection)
+        except Exception:
+            pass
+
+    def _release_slot(self):
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def _expired(self, created):
+        return (
+            self.max_lifetime is not None
+            and time.monotonic() - created > self.max_lifetime
+        )
+
+    def _healthy(self, connection, created, last_used):
+        if self._expired(created):
+            return False
+        if time.monotonic() - last_used < self.check_after:
+            return True
+        try:
+            return self.check(connection)
+        except Exception:
+            return False
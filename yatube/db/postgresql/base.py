@@ -0,0 +1,128 @@
+"""PostgreSQL backend that takes its connections from a ConnectionPool.
+
+    DATABASES['default']['ENGINE'] = 'yatube.db.postgresql'
+    DATABASES['default']['POOL'] = {'MAX_SIZE': 4, 'TIMEOUT': 10}
+
+Use it with CONN_MAX_AGE = 0: Django then "closes" the connection after
+every request, which puts it back into the pool of the worker process.
+"""
+import os
+import threading
+from functools import partial
+
+import psycopg2.extras
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from ..pool import ConnectionPool
+
+POOL_DEFAULTS = {
+    'MAX_SIZE': 4,
+    'TIMEOUT': 10,
+    'CHECK_AFTER': 30,
+    'MAX_LIFETIME': 30 * 60,
+}
+
+_pools = {}
+_pools_pid = None
+_pools_lock = threading.Lock()
+
+
+def get_pool(settings_dict, conn_params):
+    global _pools_pid
+    # The test runner switches NAME to the test database: connections to
+    # different databases must never share a pool.
+    key = tuple(sorted(
+        (name, str(value)) for name, value in conn_params.items()
+    ))
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            # A forked worker must not use the sockets of its parent
+            _pools.clear()
+            _pools_pid = os.getpid()
+        if key not in _pools:
+            options = {**POOL_DEFAULTS, **settings_dict.get('POOL', {})}
+            _pools[key] = ConnectionPool(
+                partial(
+                    open_connection, conn_params, settings_dict['OPTIONS']
+                ),
+                check_connection, close_connection,
+                max_size=options['MAX_SIZE'],
+                timeout=options['TIMEOUT'],
+                check_after=options['CHECK_AFTER'],
+                max_lifetime=options['MAX_LIFETIME'],
+            )
+        return _pools[key]
+
+
+def reset_pools():
+    """Forget the pools of the process, e.g. in a freshly forked worker."""
+    global _pools_pid
+    with _pools_lock:
+        _pools.clear()
+        _pools_pid = os.getpid()
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
+
+
+def open_connection(conn_params, options):
+    """What base.DatabaseWrapper.get_new_connection() does, minus the
+    wrapper state, so that any thread's wrapper can use the result."""
+    connection = base.Database.connect(**conn_params)
+    isolation_level = options.get('isolation_level')
+    if (
+        isolation_level is not None
+        and isolation_level != connection.isolation_level
+    ):
+        connection.set_session(isolation_level=isolation_level)
+    psycopg2.extras.register_default_jsonb(
+        conn_or_curs=connection, loads=lambda x: x
+    )
+    return connection
+
+
+def check_connection(connection):
+    if connection.closed:
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    if not connection.autocommit:
+        connection.rollback()
+    return True
+
+
+def close_connection(connection):
+    if not connection.closed:
+        connection.close()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    @property
+    def pool(self):
+        return get_pool(self.settings_dict, self.get_connection_params())
+
+    def get_new_connection(self, conn_params):
+        connection = self.pool.checkout()
+        # The parent class reads it from a new connection
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None:
+            return
+        discard = bool(self.connection.closed)
+        if not discard:
+            status = self.connection.get_transaction_status()
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    self.connection.rollback()
+                except base.Database.Error:
+                    discard = True
+        self.pool.checkin(self.connection, discard=discard)
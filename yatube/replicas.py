@@ -0,0 +1,117 @@
+"""Routing of safe reads to read replicas.
+
+Reads go to one of settings.DATABASE_REPLICAS only inside a request that
+ReplicaMiddleware marked safe: a GET/HEAD/OPTIONS request of a client that
+has not written anything recently. Everything else - writes, reads after
+a write in the same request, management commands, background workers -
+uses the primary.
+
+After a request that wrote, the client gets a short-lived cookie that
+keeps its reads on the primary, so it sees its own post or comment right
+after the redirect even if the replicas lag behind.
+
+Only the models of ROUTED_APPS are routed. The cache table and the
+sessions stay on the primary and never pin a client: an anonymous page
+stored in a DatabaseCache is not a write of the visitor. A response that
+shared caches may store never gets the cookie.
+"""
+import asyncio
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY = 'default'
+PIN_COOKIE = 'pin_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+ROUTED_APPS = ('posts', 'auth')
+
+
+class RequestState:
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+_current = ContextVar('replica_request', default=None)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in ROUTED_APPS:
+            return None
+        state = _current.get()
+        if settings.DATABASE_REPLICAS and state and state.use_replica:
+            return random.choice(settings.DATABASE_REPLICAS)
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in ROUTED_APPS:
+            return None
+        state = _current.get()
+        if state:
+            # Read your own writes for the rest of the request
+            state.wrote, state.use_replica = True, False
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+def is_public(response):
+    directives = response.get('Cache-Control', '').split(',')
+    return 'public' in {
+        directive.split('=')[0].strip().lower() for directive in directives
+    }
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Mark the instance as a coroutine function for the ASGI handler
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        state, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.pin(state, response)
+
+    async def __acall__(self, request):
+        # The state is shared with the threads the async views query in
+        state, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.pin(state, response)
+
+    def start(self, request):
+        state = RequestState(
+            request.method in SAFE_METHODS
+            and PIN_COOKIE not in request.COOKIES
+        )
+        return state, _current.set(state)
+
+    def pin(self, state, response):
+        if (
+            state.wrote and settings.DATABASE_REPLICAS
+            and not is_public(response)
+        ):
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax'
+            )
+        return response
@@ -11,9 +11,13 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import sys
 from dotenv import load_dotenv
+import dj_database_url
 import django_heroku
 
+from yatube.caches import cache_from_url
+
 load_dotenv()
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -51,6 +55,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'posts.middleware.PerformanceMiddleware',
+    'yatube.replicas.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,12 +70,21 @@ MIDDLEWARE = [
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'posts.metrics.InstrumentedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Templates are compiled once per process, warmed up by
+            # `manage.py check_templates` and gunicorn.conf.py. With DEBUG
+            # they are read again on every render to pick up edits.
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -89,10 +104,28 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'NAME': os.getenv(
+            'SQLITE_PATH', os.path.join(BASE_DIR, 'db.sqlite3')
+        ),
     }
 }
 
+# A read replica of the default database, e.g. postgres://... or, to try it
+# locally, sqlite:////path/to/copy-of-db.sqlite3. Safe reads are routed to
+# it by yatube.replicas.ReplicaRouter.
+DATABASE_REPLICAS = []
+if os.getenv('REPLICA_DATABASE_URL'):
+    DATABASES['replica'] = dj_database_url.parse(
+        os.getenv('REPLICA_DATABASE_URL')
+    )
+    # Tests read the test copy of the default database through it
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append('replica')
+
+DATABASE_ROUTERS = ['yatube.replicas.ReplicaRouter']
+# Seconds the reads of a client stay on the primary after it wrote
+REPLICA_PIN_SECONDS = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -133,14 +166,119 @@ LOGOUT_REDIRECT_URL = "index"
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
+POSTS_PER_PAGE = 10
+# 'page' - numbered pages (?page=N), 'cursor' - keyset pages (?cursor=...)
+POSTS_PAGINATION = os.getenv('POSTS_PAGINATION', 'page')
+# Authors with more followers than this are merged into the follow feed
+# at read time instead of being fanned out to every follower's timeline.
+POSTS_TIMELINE_FANOUT_LIMIT = 1000
+# How many recent posts of an author are copied into a new follower's timeline
+POSTS_TIMELINE_BACKFILL = 200
+# Comments shown on a post page and loaded by each "More comments" request
+POSTS_COMMENTS_PER_PAGE = 20
+# How long a CDN may serve public pages without revalidating them
+POSTS_SHARED_CACHE_SECONDS = 60
+# Full pages served to anonymous visitors, purged by tag on writes. Comment
+# counters on feed cards may lag behind by up to this long.
+POSTS_PAGE_CACHE_TIMEOUT = 60 * 5
+# Post counts of numbered feed pages. A write bumps the count of its feeds
+# at once, the timeout only drops the counts of old tag versions.
+POSTS_COUNT_CACHE_TIMEOUT = 60 * 60
+# Rendered post cards are cached per post version, see posts/cards.py
+POSTS_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+# Processes building post thumbnails in the background, 0 - in the request
+POSTS_THUMBNAIL_WORKERS = int(os.getenv('POSTS_THUMBNAIL_WORKERS', 2))
+# Thumbnail URLs kept in each process, in front of the shared cache
+POSTS_THUMBNAIL_LRU_SIZE = 1024
+
+# Uploaded post images: larger files or images with more pixels are
+# rejected, the rest is re-encoded without metadata into a master of at
+# most POSTS_IMAGE_MASTER_SIZE pixels a side and renditions of each width
+# in each format the Pillow build can write, see posts/images.py
+POSTS_IMAGE_MAX_UPLOAD_SIZE = 20 * 1024 * 1024
+POSTS_IMAGE_MAX_PIXELS = 50_000_000
+POSTS_IMAGE_MASTER_SIZE = 2048
+POSTS_IMAGE_WIDTHS = (480, 960, 1440)
+POSTS_IMAGE_FORMATS = ('avif', 'webp', 'jpeg')
+
+# Set while `manage.py test` or pytest runs the tests
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+# Side effects of writes (timeline fan-out, search indexing, thumbnails)
+# are queued for the `worker` process (`manage.py run_jobs`), or with 1
+# run inside the request: the default with DEBUG and in the tests only
+JOBS_ALWAYS_EAGER = bool(int(
+    os.getenv('JOBS_ALWAYS_EAGER', int(DEBUG or TESTING))
+))
+# A failed job is retried after JOBS_RETRY_DELAY seconds, doubled on
+# every attempt, and given up after JOBS_MAX_ATTEMPTS
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_DELAY = 10
+# Running jobs of a worker silent for this long are queued again
+JOBS_LOCK_TIMEOUT = 60 * 10
+# Seconds run_jobs sleeps while the queue is empty
+JOBS_POLL_INTERVAL = 1
+
+# Send the index, profile and post pages as a stream: the layout first,
+# then the post cards and comments as they are rendered
+POSTS_STREAM_PAGES = bool(int(os.getenv('POSTS_STREAM_PAGES', 0)))
+
+# Async feed views (posts/async_views.py), set by yatube/asgi.py
+POSTS_ASYNC_VIEWS = bool(int(os.getenv('POSTS_ASYNC_VIEWS', 0)))
+
+# Rolling per-view metrics kept by posts.middleware.PerformanceMiddleware
+PERFORMANCE_SUMMARY_SIZE = 500
+# Maximum SQL queries per request of a view (by URL name), checked by the
+# middleware and by posts.tests.utils.QueryBudgetMixin
+QUERY_BUDGETS = {
+    'index': 4,
+    'group': 5,
+    'profile': 7,
+    'post': 7,
+    'post_comments': 4,
+    'api:index': 1,
+    'api:group': 2,
+    'api:profile': 2,
+    'api:post': 2,
+    'api:follow_index': 5,
+    'follow_index': 6,
+}
+
 CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+    'default': cache_from_url(
+        os.getenv('CACHE_URL', 'locmem://'),
+        key_prefix=os.getenv('CACHE_KEY_PREFIX', 'yatube')
+    )
 }
+# Seconds a worker waits for another one rebuilding the same cache entry
+CACHE_LOCK_TIMEOUT = 10
 
 django_heroku.settings(locals())
 
+# Connections kept in a pool of every worker process instead of a new one
+# per request, PostgreSQL only, see yatube/db/pool.py. The pool serves all
+# threads of a worker: size it to gunicorn's --threads.
+DATABASE_POOL_SIZE = int(os.getenv('DATABASE_POOL_SIZE', 0))
+if DATABASE_POOL_SIZE:
+    for alias in ['default'] + DATABASE_REPLICAS:
+        if DATABASES[alias]['ENGINE'].startswith('django.db.backends.postgres'):
+            DATABASES[alias].update({
+                'ENGINE': 'yatube.db.postgresql',
+                'CONN_MAX_AGE': 0,
+                'POOL': {
+                    'MAX_SIZE': DATABASE_POOL_SIZE,
+                    'TIMEOUT': int(os.getenv('DATABASE_POOL_TIMEOUT', 10)),
+                },
+            })
+
+# Storage of post images, see yatube/storage.py: 's3' - the bucket below,
+# 'local' - MEDIA_ROOT, served by Django with DEBUG (without it by a web
+# server in front of the app). The default is the bucket when
+# its credentials are set.
+MEDIA_STORAGE = os.getenv(
+    'MEDIA_STORAGE',
+    's3' if os.getenv('AWS_ACCESS_KEY_ID') and not DEBUG else 'local'
+)
+
 if not DEBUG:
     AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
     AWS_SECRET_ACCESS_KEY = os.getenv('AWS_SECRET_ACCESS_KEY')
@@ -155,8 +293,9 @@ if not DEBUG:
     STATIC_URL =  'https://%s/%s/' % (AWS_S3_CUSTOM_DOMAIN, AWS_STATIC_LOCATION)
     
 
-    DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
-    MEDIA_URL = 'https://%s/%s/' % (AWS_S3_CUSTOM_DOMAIN, AWS_MEDIA_LOCATION)
+    if MEDIA_STORAGE == 's3':
+        DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
+        MEDIA_URL = 'https://%s/%s/' % (AWS_S3_CUSTOM_DOMAIN, AWS_MEDIA_LOCATION)
 
     STATICFILES_DIRS = (
     os.path.join(BASE_DIR, 'static'),
@@ -169,7 +308,6 @@ else:
     STATIC_URL = '/static/'
     STATIC_ROOT = os.path.join(BASE_DIR, "static")
 
+if MEDIA_STORAGE == 'local':
     MEDIA_URL = '/imgs/'
     MEDIA_ROOT = os.path.join(BASE_DIR, "media")
-
-
@@ -0,0 +1,112 @@
+"""Storage of uploaded media, picked by the MEDIA_STORAGE setting.
+
+    local   files under MEDIA_ROOT, served by Django under MEDIA_URL
+            with DEBUG only
+    s3      the media/ folder of the AWS_STORAGE_BUCKET_NAME bucket
+
+Both store a file under the SHA-256 of its content, e.g.
+posts/3f/a2/3fa2...e1.jpg: an upload identical to a stored file gets the
+name of that file and is not written or sent again. A stored file may
+be shared by several posts: posts.images deletes a replaced image only
+when no other post shows it.
+"""
+import hashlib
+import os
+import posixpath
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.cache import patch_cache_control
+from django.utils.functional import LazyObject, empty
+from django.utils.module_loading import import_string
+from django.views.static import serve
+
+BACKENDS = {
+    'local': 'yatube.storage.LocalMediaStorage',
+    's3': 's3utils.MediaStorage',
+}
+
+
+class ContentAddressedMixin:
+    """Names every saved file by the hash of its content.
+
+    The directory and the extension of the name given to save() are
+    kept, the file name is replaced by the hash under two levels of
+    shard directories, so no directory grows past 256 entries per level.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.content_name(name, content)
+        try:
+            return super().save(name, content, max_length)
+        except FileExistsError:
+            return name
+
+    def get_available_name(self, name, max_length=None):
+        """The hashed name itself, never an alternative like <hash>_AbC12.
+
+        A file of that name has the same content: it is reported to save()
+        as done, both before writing and when FileSystemStorage finds the
+        file written meanwhile by a concurrent save.
+        """
+        if max_length is not None and len(name) > max_length:
+            raise SuspiciousFileOperation(
+                f'Storage can not find an available filename for "{name}".'
+            )
+        if self.exists(name):
+            raise FileExistsError(name)
+        return name
+
+    def content_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        hexdigest = digest.hexdigest()
+        directory, basename = posixpath.split(name.replace('\\', '/'))
+        extension = os.path.splitext(basename)[1].lower()
+        return posixpath.join(
+            directory, hexdigest[:2], hexdigest[2:4], hexdigest + extension
+        )
+
+
+class LocalMediaStorage(ContentAddressedMixin, FileSystemStorage):
+    pass
+
+
+class MediaStorage(LazyObject):
+    """The storage of MEDIA_STORAGE, created on first use."""
+
+    def _setup(self):
+        self._wrapped = import_string(BACKENDS[settings.MEDIA_STORAGE])()
+
+
+media_storage = MediaStorage()
+
+
+def get_media_storage():
+    # A callable keeps the storage out of the migrations
+    return media_storage
+
+
+@receiver(setting_changed)
+def reset_media_storage(setting, **kwargs):
+    if setting in ('MEDIA_STORAGE', 'MEDIA_ROOT', 'MEDIA_URL'):
+        media_storage._wrapped = empty
+
+
+def serve_media(request, path):
+    """A file of the local storage: its name changes with its content."""
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    patch_cache_control(
+        response, public=True, max_age=60 * 60 * 24 * 365, immutable=True
+    )
+    return response
@@ -0,0 +1,36 @@
+"""Compiling the project templates before the first request.
+
+With the cached loader a template is read and parsed on its first
+render in every process. warm_up() does that for all the templates
+under the DIRS of the template engines at once: a worker serves its
+first requests without parsing, and a broken template fails the build
+instead of a request.
+"""
+import os
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt')
+
+
+def template_names(directory):
+    for root, dirs, files in os.walk(directory):
+        for name in files:
+            if name.endswith(TEMPLATE_EXTENSIONS):
+                path = os.path.relpath(os.path.join(root, name), directory)
+                yield path.replace(os.sep, '/')
+
+
+def warm_up():
+    """Compile every template, returns (names, {name: error})."""
+    compiled, errors = [], {}
+    for engine in engines.all():
+        for directory in engine.dirs:
+            for name in sorted(template_names(directory)):
+                try:
+                    engine.get_template(name)
+                except (TemplateSyntaxError, TemplateDoesNotExist) as exc:
+                    errors[name] = exc
+                else:
+                    compiled.append(name)
+    return compiled, errors